@@ -0,0 +1,133 @@
+# Sakura/Chat/audio.py
+import asyncio
+import random
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Optional, Tuple
+from pyrogram import Client
+from pyrogram.types import Message
+from Sakura.Core.config import MODEL_ROUTES, VOICE_MAX_BYTES, VOICE_BITRATE, VOICE_TRANSCRIPT_TOKENS, AUDIO_WORKERS
+from Sakura.Core.helpers import log_action
+from Sakura.Core.logging import logger
+from Sakura.Modules.messages import VOICE_MESSAGES
+from Sakura.Modules.typing import send_typing
+from Sakura.Database.cache import get_voice_transcript, set_voice_transcript
+from Sakura.Chat.chat import get_response, generate, route_config
+from Sakura.Chat.breaker import call_model
+from Sakura.Chat.media import download_slots
+from Sakura.Chat.voice import FFMPEG_AVAILABLE
+from Sakura.Services.scheduler import schedule
+from Sakura import state
+
+TRANSCRIBE_PROMPT = """Transcribe this voice note word for word in the language it is spoken.
+Write Hindi/Hinglish in Latin script. Reply with the transcript only, or
+[unclear] if nothing intelligible is said."""
+
+# Notes already below this bitrate (bits/s) are sent as they are
+TRANSCODE_ABOVE = 24000
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _transcode(data: bytes) -> bytes:
+    """Re-encode audio as mono 16 kHz Opus at VOICE_BITRATE (runs in a worker process)."""
+    from pydub import AudioSegment
+    audio = AudioSegment.from_file(BytesIO(data)).set_channels(1).set_frame_rate(16000)
+    output = BytesIO()
+    audio.export(output, format="ogg", codec="libopus", bitrate=VOICE_BITRATE)
+    return output.getvalue()
+
+
+async def prepare_voice(client: Client, voice) -> Optional[Tuple[bytes, str]]:
+    """Download a voice note and shrink it to a compact mono Opus stream.
+
+    Transcoding runs in a process pool so decoding never blocks the loop.
+    Notes that stay above VOICE_MAX_BYTES are refused.
+
+    Returns:
+        tuple: (audio bytes, MIME type)
+        None: If the note could not be fetched or is too large
+    """
+    global _pool
+    async with download_slots():
+        voice_file = await client.download_media(voice.file_id, in_memory=True)
+    if not voice_file:
+        return None
+    data = voice_file.getvalue()
+
+    duration = voice.duration or 1
+    if FFMPEG_AVAILABLE and len(data) * 8 / duration > TRANSCODE_ABOVE:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=AUDIO_WORKERS)
+        try:
+            compact = await asyncio.get_running_loop().run_in_executor(_pool, _transcode, data)
+            if compact and len(compact) < len(data):
+                logger.debug(f"🎙️ Voice note transcoded: {len(data)} → {len(compact)} bytes")
+                data = compact
+        except Exception as e:
+            logger.warning(f"⚠️ Voice transcoding failed, sending original: {e}")
+
+    if len(data) > VOICE_MAX_BYTES:
+        logger.warning(f"⚠️ Voice note too large to send ({len(data)} bytes)")
+        return None
+    return data, "audio/ogg"
+
+
+async def transcribe_voice(client: Client, voice, user_info: dict) -> Optional[str]:
+    """Turn a voice note into text, reusing transcripts by file_unique_id.
+
+    Returns:
+        str: The transcript
+        None: If the note was unclear, too large or transcription failed
+    """
+    transcript = await get_voice_transcript(voice.file_unique_id)
+    if transcript:
+        log_action("DEBUG", "🎙️ Using cached voice transcript", user_info)
+        return transcript
+
+    if not state.llm_backend:
+        return None
+    prepared = await prepare_voice(client, voice)
+    if not prepared:
+        return None
+    audio_part = state.llm_backend.inline_part(*prepared)
+
+    async def attempt(model: str):
+        return await generate(
+            model=model,
+            contents=[TRANSCRIBE_PROMPT, audio_part],
+            config=route_config(MODEL_ROUTES["chat"], temperature=0.0, max_output_tokens=VOICE_TRANSCRIPT_TOKENS)
+        )
+
+    try:
+        response = await call_model(attempt, primary=MODEL_ROUTES["chat"]["model"])
+    except Exception as e:
+        log_action("ERROR", f"❌ Voice transcription failed: {e}", user_info)
+        return None
+
+    transcript = response.text.strip() if response.text else None
+    if not transcript or transcript == "[unclear]":
+        return None
+    await set_voice_transcript(voice.file_unique_id, transcript)
+    log_action("INFO", f"🎙️ Voice note transcribed: '{transcript}'", user_info)
+    return transcript
+
+
+async def reply_voice_note(client: Client, message: Message, user_info: dict) -> None:
+    """Answer a voice note by sending the audio itself along with the reply request."""
+    await send_typing(client, message.chat.id, user_info)
+
+    async def analyze():
+        prepared = await prepare_voice(client, message.voice)
+        if not prepared:
+            return None
+        audio_part = state.llm_backend.inline_part(*prepared)
+        return await get_response("[Voice note]", user_info["user_id"], user_info, kind="chat", images=[audio_part])
+
+    try:
+        response = await schedule(user_info, analyze())
+    except Exception as e:
+        log_action("ERROR", f"❌ Error answering voice note: {e}", user_info)
+        response = None
+
+    await message.reply_text(response or random.choice(VOICE_MESSAGES["unclear"]))
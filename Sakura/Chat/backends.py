@@ -0,0 +1,196 @@
+# Sakura/Chat/backends.py
+import time
+from abc import ABC, abstractmethod
+import aiohttp
+import orjson
+from io import BytesIO
+from types import SimpleNamespace
+from typing import Optional, List
+from google import genai
+from Sakura.Core.config import FILE_HANDLE_TTL
+from Sakura.Core.logging import logger
+from Sakura.Chat.clients import client_for
+from Sakura import state
+
+
+class LLMBackend(ABC):
+    """Interface the chat layer uses to talk to a language model.
+
+    Responses (and stream chunks) expose the attributes the chat layer reads:
+    `text`, `usage_metadata` (prompt_token_count, candidates_token_count,
+    thoughts_token_count, total_token_count) and `candidates[0].finish_reason`.
+    Errors are raised as exceptions whose message carries the HTTP status
+    (e.g. "429 RESOURCE_EXHAUSTED"), so key rotation and the circuit breaker
+    treat every backend alike.
+    """
+
+    name = "base"
+    supports_caching = False
+
+    @abstractmethod
+    def create_chat(self, model: str, config: dict, history: List[dict], key: Optional[int] = None):
+        """Return a chat session with async send_message and send_message_stream.
+
+        Args:
+            key: API key index the session is bound to; the active key when None
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def generate(self, model: str, contents, config: dict, key: Optional[int] = None):
+        """Single-turn generation without a chat session, sent with the given key index."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def inline_part(self, data: bytes, mime_type: str):
+        """Wrap inline bytes of any MIME type (image, audio, video) as a message part."""
+        raise NotImplementedError
+
+    async def upload(self, data: bytes, mime_type: str, key: Optional[int] = None) -> Optional[dict]:
+        """Upload a file to the provider for reuse across requests made with the same key.
+
+        Returns:
+            dict: A JSON-serialisable handle for file_part, or None if unsupported
+        """
+        return None
+
+    def file_part(self, handle: dict, key: Optional[int] = None):
+        """Message part for an uploaded file, or None if the handle is not usable with this key."""
+        return None
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini through the pooled client of the key a request was counted on."""
+
+    name = "gemini"
+    supports_caching = True
+
+    def create_chat(self, model: str, config: dict, history: List[dict], key: Optional[int] = None):
+        return client_for(key).aio.chats.create(model=model, config=config, history=history)
+
+    async def generate(self, model: str, contents, config: dict, key: Optional[int] = None):
+        return await client_for(key).aio.models.generate_content(model=model, contents=contents, config=config)
+
+    def inline_part(self, data: bytes, mime_type: str):
+        return genai.types.Part.from_bytes(data=data, mime_type=mime_type)
+
+    async def upload(self, data: bytes, mime_type: str, key: Optional[int] = None) -> Optional[dict]:
+        key = state.key_index if key is None else key
+        file = await client_for(key).aio.files.upload(file=BytesIO(data), config={"mime_type": mime_type})
+        # Files belong to the key's project, so the handle only works with the same key
+        return {"uri": file.uri, "mime_type": mime_type, "key": key, "expires": time.time() + FILE_HANDLE_TTL}
+
+    def file_part(self, handle: dict, key: Optional[int] = None):
+        key = state.key_index if key is None else key
+        if handle.get("key") != key or handle.get("expires", 0) <= time.time():
+            return None
+        return genai.types.Part.from_uri(file_uri=handle["uri"], mime_type=handle["mime_type"])
+
+
+class MockBackendError(Exception):
+    """Error status returned by the mock LLM server."""
+
+
+def _mock_response(payload: dict) -> SimpleNamespace:
+    usage = payload.get("usage")
+    return SimpleNamespace(
+        text=payload.get("text"),
+        usage_metadata=SimpleNamespace(**usage) if usage else None,
+        candidates=[SimpleNamespace(finish_reason=payload.get("finish_reason", "STOP"))]
+    )
+
+
+class MockChat:
+    """Chat session against the mock server; keeps its own history like the SDK does."""
+
+    def __init__(self, backend: "MockBackend", model: str, config: dict, history: List[dict]):
+        self.backend = backend
+        self.model = model
+        self.config = config
+        self.history = list(history)
+
+    def _body(self, content, stream: bool) -> dict:
+        parts = content if isinstance(content, list) else [content]
+        return {
+            "model": self.model,
+            "stream": stream,
+            "system": bool(self.config.get("system_instruction") or self.config.get("cached_content")),
+            "max_output_tokens": self.config.get("max_output_tokens"),
+            "history_chars": sum(len(part.get("text", "")) for turn in self.history for part in turn["parts"]),
+            "text": " ".join(part for part in parts if isinstance(part, str)),
+            "images": sum(1 for part in parts if isinstance(part, dict) and "mime_type" in part),
+        }
+
+    async def send_message(self, content):
+        response = _mock_response(await self.backend.post(self._body(content, False)))
+        self._remember(content, response.text or "")
+        return response
+
+    async def send_message_stream(self, content):
+        body = self._body(content, True)
+
+        async def chunks():
+            text = ""
+            async for payload in self.backend.post_stream(body):
+                chunk = _mock_response(payload)
+                text += chunk.text or ""
+                yield chunk
+            self._remember(content, text)
+
+        return chunks()
+
+    def _remember(self, content, reply: str) -> None:
+        text = content if isinstance(content, str) else " ".join(p for p in content if isinstance(p, str))
+        self.history.append({"role": "user", "parts": [{"text": text}]})
+        self.history.append({"role": "model", "parts": [{"text": reply}]})
+
+
+class MockBackend(LLMBackend):
+    """Local HTTP stand-in for load tests; see Sakura/Chat/mockserver.py."""
+
+    name = "mock"
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    def _session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=0),
+                json_serialize=lambda obj: orjson.dumps(obj).decode()
+            )
+        return self.session
+
+    async def post(self, body: dict) -> dict:
+        async with self._session().post(f"{self.url}/generate", json=body) as resp:
+            payload = await resp.json(loads=orjson.loads)
+            if resp.status != 200:
+                raise MockBackendError(f"{resp.status} {payload.get('error', 'mock error')}")
+            return payload
+
+    async def post_stream(self, body: dict):
+        async with self._session().post(f"{self.url}/generate", json=body) as resp:
+            if resp.status != 200:
+                payload = await resp.json(loads=orjson.loads)
+                raise MockBackendError(f"{resp.status} {payload.get('error', 'mock error')}")
+            async for line in resp.content:
+                if line.strip():
+                    yield orjson.loads(line)
+
+    def create_chat(self, model: str, config: dict, history: List[dict], key: Optional[int] = None):
+        return MockChat(self, model, config, history)
+
+    async def generate(self, model: str, contents, config: dict, key: Optional[int] = None):
+        return await MockChat(self, model, config, []).send_message(contents)
+
+    def inline_part(self, data: bytes, mime_type: str):
+        return {"mime_type": mime_type, "size": len(data)}
+
+
+def create_backend(name: str, mock_url: str) -> LLMBackend:
+    """Build the configured backend."""
+    if name == "mock":
+        logger.warning(f"🧪 Using mock LLM backend at {mock_url}")
+        return MockBackend(mock_url)
+    return GeminiBackend()
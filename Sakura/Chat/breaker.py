@@ -0,0 +1,174 @@
+# Sakura/Chat/breaker.py
+import asyncio
+import time
+from collections import deque
+from typing import Dict, Optional
+from Sakura.Core.config import (
+    AI_MODEL, FALLBACK_MODEL, HEDGING,
+    BREAKER_WINDOW, BREAKER_MIN_CALLS, BREAKER_ERROR_RATE, BREAKER_LATENCY, BREAKER_COOLDOWN
+)
+from Sakura.Core.logging import logger
+
+
+class CircuitOpenError(Exception):
+    """Raised when every configured model is behind an open circuit."""
+
+
+class CircuitBreaker:
+    """Track recent outcomes of one model and stop calling it while it is unhealthy.
+
+    The circuit opens when, over the last BREAKER_WINDOW calls, the error rate
+    or the p95 latency crosses its threshold. After BREAKER_COOLDOWN seconds a
+    single trial call is let through (half-open); its outcome closes the
+    circuit again or re-opens it.
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self.state = "closed"
+        self.calls = deque(maxlen=BREAKER_WINDOW)
+        self.opened_at = 0.0
+        self.trial = False
+        self.trips = 0
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= BREAKER_COOLDOWN:
+            self._set_state("half_open")
+        if self.state == "half_open" and not self.trial:
+            self.trial = True
+            return True
+        return False
+
+    def record(self, ok: bool, latency: float) -> None:
+        if self.state == "half_open":
+            self.trial = False
+            if ok:
+                self.calls.clear()
+                self._set_state("closed")
+            else:
+                self._open("trial call failed")
+            return
+
+        self.calls.append((ok, latency))
+        if self.state != "closed" or len(self.calls) < BREAKER_MIN_CALLS:
+            return
+        errors = sum(1 for success, _ in self.calls if not success)
+        error_rate = errors / len(self.calls)
+        p95 = self.p95()
+        if error_rate >= BREAKER_ERROR_RATE:
+            self._open(f"error rate {error_rate:.0%}")
+        elif p95 is not None and p95 >= BREAKER_LATENCY:
+            self._open(f"p95 latency {p95:.1f}s")
+
+    def p95(self) -> Optional[float]:
+        """p95 latency of recent successful calls, once there are enough of them."""
+        latencies = sorted(latency for ok, latency in self.calls if ok)
+        if len(latencies) < BREAKER_MIN_CALLS:
+            return None
+        return latencies[int(len(latencies) * 0.95) - 1]
+
+    def _open(self, reason: str) -> None:
+        self.opened_at = time.monotonic()
+        self.trips += 1
+        self._set_state("open", reason)
+
+    def _set_state(self, new_state: str, reason: str = "") -> None:
+        if new_state == self.state:
+            return
+        detail = f" ({reason})" if reason else ""
+        if new_state == "open":
+            logger.error(f"⚡ Circuit for {self.model} opened{detail}, failing fast for {BREAKER_COOLDOWN}s")
+        else:
+            logger.warning(f"⚡ Circuit for {self.model}: {self.state} → {new_state}{detail}")
+        self.state = new_state
+
+
+breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(model: str) -> CircuitBreaker:
+    if model not in breakers:
+        breakers[model] = CircuitBreaker(model)
+    return breakers[model]
+
+
+def pick_model(primary: str = AI_MODEL) -> Optional[str]:
+    """The primary model if its circuit allows a call, else the fallback model, else None."""
+    if get_breaker(primary).allow():
+        return primary
+    if FALLBACK_MODEL and FALLBACK_MODEL != primary and get_breaker(FALLBACK_MODEL).allow():
+        return FALLBACK_MODEL
+    return None
+
+
+async def timed_call(model: str, attempt):
+    """Run attempt(model) and feed its outcome and latency to the model's breaker.
+
+    A raised error is tagged with the model that failed as `error.model`.
+    """
+    start = time.monotonic()
+    try:
+        result = await attempt(model)
+    except asyncio.CancelledError:
+        # A cancelled call says nothing about health; free a half-open trial
+        get_breaker(model).trial = False
+        raise
+    except Exception as e:
+        get_breaker(model).record(False, time.monotonic() - start)
+        e.model = model
+        raise
+    get_breaker(model).record(True, time.monotonic() - start)
+    return result
+
+
+async def call_model(attempt, primary: str = AI_MODEL):
+    """Call the model through its circuit breaker, hedging slow calls when enabled.
+
+    attempt is an async callable taking a model name. With HEDGING on, if
+    the primary call outlives its recent p95 latency a second request goes
+    to the fallback model (or the primary again) and the first answer wins.
+
+    Raises:
+        CircuitOpenError: If no model is currently allowed
+        Exception: The failed call's error, with the model that ran it as `error.model`
+    """
+    model = pick_model(primary)
+    if model is None:
+        raise CircuitOpenError(f"circuit open for {primary}")
+
+    delay = get_breaker(model).p95() if HEDGING else None
+    if delay is None:
+        return await timed_call(model, attempt)
+
+    first = asyncio.create_task(timed_call(model, attempt))
+    pending = {first}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if done:
+            return first.result()
+
+        hedge_model = FALLBACK_MODEL if FALLBACK_MODEL and get_breaker(FALLBACK_MODEL).allow() else model
+        logger.debug(f"🪃 {model} slower than p95 ({delay:.1f}s), hedging with {hedge_model}")
+        pending.add(asyncio.create_task(timed_call(hedge_model, attempt)))
+
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def breaker_summary() -> Dict[str, dict]:
+    """Circuit state, trips and recent p95 latency per model."""
+    return {
+        model: {"state": breaker.state, "trips": breaker.trips, "p95": breaker.p95()}
+        for model, breaker in breakers.items()
+    }
@@ -0,0 +1,84 @@
+# Sakura/Chat/caching.py
+import time
+from typing import Optional
+from google.genai import types
+from Sakura.Core.config import PROMPT_CACHE, PROMPT_CACHE_TTL, PROMPT_CACHE_MARGIN, PROMPT_CACHE_RETRY
+from Sakura.Core.logging import logger
+from Sakura.Core.utils import spawn
+from Sakura.Chat.clients import client_for
+from Sakura.Chat.prompts import SAKURA_PROMPT
+from Sakura import state
+
+_refreshing: set = set()
+
+
+def get_prompt_cache(model: str, key: Optional[int] = None) -> Optional[str]:
+    """Get the cached-content name holding SAKURA_PROMPT for a model.
+
+    Never waits on the API: when the cache is missing or close to expiry a
+    background refresh is scheduled, and None is returned until a usable
+    cache exists so callers fall back to sending the system instruction.
+    """
+    if not PROMPT_CACHE or not state.gemini_client:
+        return None
+
+    # Cached content belongs to the API key's project, so keep one per key
+    key = state.key_index if key is None else key
+    cache_key = f"{key}:{model}"
+    now = time.time()
+    entry = state.prompt_caches.get(cache_key)
+
+    if not entry:
+        if now >= state.prompt_cache_retry.get(cache_key, 0):
+            schedule_refresh(cache_key, model, key)
+        return None
+
+    if entry["expires"] - now <= PROMPT_CACHE_MARGIN:
+        schedule_refresh(cache_key, model, key)
+    return entry["name"] if entry["expires"] > now + 5 else None
+
+
+def schedule_refresh(cache_key: str, model: str, key: int) -> None:
+    """Start a background create/extend of the prompt cache if one is not running."""
+    if cache_key in _refreshing:
+        return
+    _refreshing.add(cache_key)
+    spawn(_refresh(cache_key, model, client_for(key)))
+
+
+async def _refresh(cache_key: str, model: str, client) -> None:
+    ttl = f"{PROMPT_CACHE_TTL}s"
+    try:
+        entry = state.prompt_caches.get(cache_key)
+        if entry and entry["expires"] > time.time() + 5:
+            await client.aio.caches.update(
+                name=entry["name"],
+                config=types.UpdateCachedContentConfig(ttl=ttl)
+            )
+            logger.debug(f"🔁 Prompt cache extended for {model}: {entry['name']}")
+        else:
+            cache = await client.aio.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    display_name="sakura-prompt",
+                    system_instruction=SAKURA_PROMPT,
+                    ttl=ttl
+                )
+            )
+            entry = {"name": cache.name}
+            logger.info(f"✅ Prompt cache created for {model}: {cache.name}")
+        entry["expires"] = time.time() + PROMPT_CACHE_TTL
+        state.prompt_caches[cache_key] = entry
+    except Exception as e:
+        state.prompt_caches.pop(cache_key, None)
+        state.prompt_cache_retry[cache_key] = time.time() + PROMPT_CACHE_RETRY
+        logger.warning(f"⚠️ Prompt caching unavailable for {model}, sending full prompt: {e}")
+    finally:
+        _refreshing.discard(cache_key)
+
+
+def invalidate_prompt_cache(model: str, key: Optional[int] = None) -> None:
+    """Forget a key's prompt cache for a model after the API rejected it (the active key when None)."""
+    key = state.key_index if key is None else key
+    if state.prompt_caches.pop(f"{key}:{model}", None):
+        logger.warning(f"⚠️ Prompt cache for {model} dropped, will be recreated")
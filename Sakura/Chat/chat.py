@@ -1,32 +1,156 @@
 # Sakura/Chat/chat.py
+import asyncio
 import base64
+import time
 from typing import Optional, Dict
-from google import genai
-from Sakura.Core.config import GEMINI_API_KEY, AI_MODEL
+from pyrogram.types import Message
+from pyrogram.errors import FloodWait, MessageNotModified
+from Sakura.Core.config import GEMINI_API_KEYS, LLM_BACKEND, MOCK_LLM_URL, AI_MODEL, AI_CONCURRENCY, AI_TIMEOUT, STREAM_EDIT_INTERVAL, HISTORY_TOKEN_BUDGET, MODEL_ROUTES, LONG_MESSAGE_CHARS
 from Sakura.Core.logging import logger
 from Sakura.Core.helpers import log_action, get_fallback, get_error
-from Sakura.Database.conversation import get_history, update_history
+from Sakura.Database.conversation import build_history, update_history, get_summary, estimate_tokens
 from Sakura.Chat.prompts import SAKURA_PROMPT
+from Sakura.Chat.caching import get_prompt_cache, invalidate_prompt_cache
+from Sakura.Chat.clients import init_clients, record_request, record_error
+from Sakura.Chat.breaker import call_model, pick_model, get_breaker, CircuitOpenError
+from Sakura.Chat.backends import create_backend
 from Sakura import state
 
 def init_client():
-    """Initialize Google Gemini client for chat."""
-    if not GEMINI_API_KEY:
+    """Initialize the chat backend: Gemini clients (one per API key) or the mock server."""
+    if LLM_BACKEND == "mock":
+        state.llm_backend = create_backend(LLM_BACKEND, MOCK_LLM_URL)
+        state.gemini_semaphore = asyncio.Semaphore(AI_CONCURRENCY)
+        return
+    if not GEMINI_API_KEYS:
         logger.warning("⚠️ No Gemini API key found, chat functionality will be disabled.")
         return
-    logger.info("🫡 Initializing Google GenAI API key.")
+    logger.info(f"🫡 Initializing {len(GEMINI_API_KEYS)} Google GenAI API key(s).")
     try:
-        state.gemini_client = genai.Client(api_key=GEMINI_API_KEY)
-        logger.info("✅ Chat client (Gemini) initialized successfully")
+        if not init_clients(GEMINI_API_KEYS):
+            logger.error("❌ Failed to initialize chat client: no usable API key")
+            return
+        state.gemini_semaphore = asyncio.Semaphore(AI_CONCURRENCY)
+        state.llm_backend = create_backend(LLM_BACKEND, MOCK_LLM_URL)
+        logger.info(f"✅ Chat client (Gemini) initialized successfully ({len(state.gemini_clients)} keys, max {AI_CONCURRENCY} in-flight, {AI_TIMEOUT}s timeout)")
     except Exception as e:
         logger.error(f"❌ Failed to initialize chat client: {e}")
 
+def classify_request(message_text: str, has_image: bool = False, kind: Optional[str] = None) -> str:
+    """Pick the message class used to route a request to a model and budget."""
+    if kind in MODEL_ROUTES:
+        return kind
+    if has_image:
+        return "image"
+    if len(message_text) > LONG_MESSAGE_CHARS:
+        return "long"
+    return "chat"
+
+def route_config(route: dict, **config) -> dict:
+    """Generation config carrying a route's thinking budget, left out when the route keeps the model default."""
+    if route.get("thinking_budget") is not None:
+        config["thinking_config"] = {"thinking_budget": route["thinking_budget"]}
+    return config
+
+async def create_session(
+    user_id: int,
+    save_history: bool = True,
+    model: str = AI_MODEL,
+    route: Optional[dict] = None,
+    key: Optional[int] = None
+) -> tuple:
+    """Create an async Gemini chat session seeded with the system prompt and history.
+
+    The request is counted on a key before the session is built, and the
+    session stays bound to that key even if the pool rotates meanwhile. A
+    given key (one the request's uploaded files belong to) is used as is.
+
+    Returns:
+        tuple: (chat session, estimated history tokens, key index)
+    """
+    # Get token-budgeted chat history and running summary only if we're saving history
+    summary = await get_summary(user_id) if save_history else None
+    summary_tokens = estimate_tokens(summary) if summary else 0
+    history, history_tokens = await build_history(user_id, HISTORY_TOKEN_BUDGET - summary_tokens) if save_history else ([], 0)
+
+    # Build history in the correct format for Gemini
+    formatted_history = []
+    if history:
+        for msg in history:
+            role = "user" if msg['role'] == 'user' else "model"
+            formatted_history.append({
+                "role": role,
+                "parts": [{"text": str(msg['content'])}]
+            })
+
+    # Prepend the summary of older, evicted turns to the first user turn
+    if summary and formatted_history:
+        formatted_history[0]["parts"].insert(0, {"text": f"[Earlier conversation summary: {summary}]"})
+        history_tokens += summary_tokens
+
+    # Initialize chat session with system prompt and history
+    # CHANGED: Removed user name from system instruction to avoid overusing it
+    route = route or MODEL_ROUTES["long"]
+    config = route_config(route, temperature=0.5, max_output_tokens=route["max_output_tokens"])
+    # Reference the server-side cached prompt when available, else send it inline
+    key = record_request(key)
+    cache_name = get_prompt_cache(model, key) if state.llm_backend.supports_caching else None
+    if cache_name:
+        config["cached_content"] = cache_name
+    else:
+        config["system_instruction"] = SAKURA_PROMPT
+
+    chat_session = state.llm_backend.create_chat(model, config, formatted_history, key)
+    return chat_session, history_tokens, key
+
+def record_tokens(history_tokens: int, metadata, user_info: Dict[str, any]) -> None:
+    """Record estimated history tokens against the prompt tokens actually billed."""
+    prompt_tokens = getattr(metadata, 'prompt_token_count', 0) or 0
+    stats = state.prompt_token_stats
+    stats["prompts"] += 1
+    stats["estimated"] += history_tokens
+    stats["actual"] += prompt_tokens
+    stats["max"] = max(stats["max"], prompt_tokens)
+    log_action("DEBUG", f"🧮 Prompt tokens: ~{history_tokens} history estimate, {prompt_tokens} actual", user_info)
+
+async def run_limited(coro, key: Optional[int] = None):
+    """Await a Gemini call within the global in-flight cap and per-call timeout.
+
+    Args:
+        coro: The call to await
+        key: Key index the call was already counted on and bound to; counted on the active key when None
+    """
+    index = record_request() if key is None else key
+    try:
+        semaphore = state.gemini_semaphore
+        if semaphore is None:
+            return await asyncio.wait_for(coro, timeout=AI_TIMEOUT)
+        async with semaphore:
+            return await asyncio.wait_for(coro, timeout=AI_TIMEOUT)
+    except Exception as e:
+        record_error(index, e)
+        raise
+
+async def send_message(chat_session, content, key: Optional[int] = None):
+    """Send a message on an async chat session within the in-flight cap and timeout."""
+    return await run_limited(chat_session.send_message(content), key)
+
+async def generate(model: str, contents, config: dict):
+    """Single-turn generation on one key, within the in-flight cap and timeout."""
+    key = record_request()
+    return await run_limited(state.llm_backend.generate(model, contents, config, key), key)
+
 async def get_response(
     user_message: str,
     user_id: int,
     user_info: Dict[str, any],
     image_bytes: Optional[bytes] = None,
-    save_history: bool = True
+    save_history: bool = True,
+    kind: Optional[str] = None,
+    mime_type: str = "image/jpeg",
+    images: Optional[list] = None,
+    history_text: Optional[str] = None,
+    key: Optional[int] = None
 ) -> Optional[str]:
     """Get response from Gemini API using ChatSession.
     
@@ -36,6 +160,12 @@ async def get_response(
         user_info: User information dict
         image_bytes: Optional image bytes
         save_history: Whether to save conversation history (False for channel messages)
+        kind: Message class ("poll", "channel", ...); detected from the input if omitted
+        mime_type: MIME type of image_bytes
+        images: Further images sent in the same request (e.g. an album), as
+            (bytes, MIME type) pairs or ready-made backend parts
+        history_text: What to record as the user's turn instead of the prompt itself
+        key: API key the request must use, when images holds files uploaded with it
     
     Returns:
         str: The AI response text
@@ -44,48 +174,35 @@ async def get_response(
     user_name = user_info.get("first_name", "User")
     message_text = str(user_message) if user_message else ""
 
-    if not state.gemini_client:
+    if not state.llm_backend:
         log_action("WARNING", "❌ Chat client not available", user_info)
         return None
 
+    pinned = key
     try:
-        # Get chat history only if we're saving history
-        history = await get_history(user_id) if save_history else []
-
-        # Build history in the correct format for Gemini
-        formatted_history = []
-        if history:
-            for msg in history:
-                role = "user" if msg['role'] == 'user' else "model"
-                formatted_history.append({
-                    "role": role,
-                    "parts": [{"text": str(msg['content'])}]
-                })
-
-        # Initialize chat session with system prompt and history
-        # CHANGED: Removed user name from system instruction to avoid overusing it
-        chat_session = state.gemini_client.chats.create(
-            model=AI_MODEL,
-            config={
-                "system_instruction": SAKURA_PROMPT,
-                "temperature": 0.5,
-                "max_output_tokens": 1500,
-            },
-            history=formatted_history
-        )
-
         # Send message and get response
-        if image_bytes:
-            image_part = genai.types.Part.from_bytes(
-                data=image_bytes,
-                mime_type="image/jpeg"
-            )
-            response = chat_session.send_message([
-                message_text or 'What do you see in this image?',
-                image_part
-            ])
+        images = ([(image_bytes, mime_type)] if image_bytes else []) + (images or [])
+        if images:
+            image_parts = [
+                state.llm_backend.inline_part(*image) if isinstance(image, tuple) else image
+                for image in images
+            ]
+            content = [message_text or 'What do you see in this image?'] + image_parts
         else:
-            response = chat_session.send_message(message_text)
+            content = message_text
+
+        request_class = classify_request(message_text, bool(images), kind)
+        route = MODEL_ROUTES[request_class]
+        log_action("DEBUG", f"🧭 Routed as '{request_class}' to {route['model']}", user_info)
+
+        async def attempt(model: str):
+            nonlocal key
+            chat_session, tokens, key = await create_session(user_id, save_history, model, route, pinned)
+            return await send_message(chat_session, content, key), tokens
+
+        # Goes through the circuit breaker, which may pick the fallback model or hedge
+        response, history_tokens = await call_model(attempt, primary=route["model"])
+        record_tokens(history_tokens, getattr(response, 'usage_metadata', None), user_info)
 
         ai_response = response.text.strip() if response.text else None
 
@@ -132,20 +249,33 @@ async def get_response(
 
         # Update history only if save_history is True
         if save_history:
-            await update_history(user_id, message_text, ai_response)
+            await update_history(user_id, history_text or message_text, ai_response)
 
         return ai_response
 
+    except asyncio.TimeoutError:
+        log_action("ERROR", f"❌ AI API request timed out after {AI_TIMEOUT}s", user_info)
+        return None
+
+    except CircuitOpenError:
+        log_action("ERROR", "⚡ AI circuit open, failing fast", user_info)
+        return None
+
     except Exception as e:
         error_type = type(e).__name__
         error_msg = str(e)
+        # The model that actually failed, which may be the fallback or a hedge
+        model = getattr(e, "model", None)
+
+        if "cache" in error_msg.lower() and model:
+            invalidate_prompt_cache(model, key)
 
         if "429" in error_msg or "quota" in error_msg.lower():
             log_action("ERROR", f"❌ AI API rate limit exceeded", user_info)
         elif "401" in error_msg or "api key" in error_msg.lower():
             log_action("ERROR", f"❌ AI API authentication failed", user_info)
         elif "404" in error_msg or "not found" in error_msg.lower():
-            log_action("ERROR", f"❌ AI model not found ({AI_MODEL})", user_info)
+            log_action("ERROR", f"❌ AI model not found ({model or 'unknown'})", user_info)
         elif "timeout" in error_msg.lower():
             log_action("ERROR", f"❌ AI API request timed out", user_info)
         elif "connection" in error_msg.lower():
@@ -154,3 +284,169 @@ async def get_response(
             log_action("ERROR", f"❌ AI API error: {error_type}", user_info)
 
         return None
+
+async def stream_response(
+    message: Message,
+    user_message: str,
+    user_id: int,
+    user_info: Dict[str, any],
+    save_history: bool = True,
+    kind: Optional[str] = None
+) -> Optional[str]:
+    """Stream a Gemini reply into a single Telegram message.
+
+    The first chunk is sent as a reply as soon as it arrives and the same
+    message is then edited at most once every STREAM_EDIT_INTERVAL seconds.
+    History is written once, and only if the stream completed; a reply cut
+    off by an error or timeout is shown marked with an ellipsis.
+
+    Args:
+        message: The incoming message to reply to
+        user_message: The user's message
+        user_id: The user's ID
+        user_info: User information dict
+        save_history: Whether to save conversation history (False for channel messages)
+        kind: Message class ("channel", ...); detected from the text if omitted
+
+    Returns:
+        str: The full AI response text
+        None: If an error occurred or nothing was generated
+    """
+    message_text = str(user_message) if user_message else ""
+
+    if not state.llm_backend:
+        log_action("WARNING", "❌ Chat client not available", user_info)
+        return None
+
+    # Streams are not hedged, but still go through the circuit breaker
+    route = MODEL_ROUTES[classify_request(message_text, kind=kind)]
+    model = pick_model(route["model"])
+    if model is None:
+        log_action("ERROR", "⚡ AI circuit open, failing fast", user_info)
+        return None
+    breaker = get_breaker(model)
+
+    sent = None
+    text = ""
+    shown = ""
+    last_edit = 0.0
+    usage = None
+    history_tokens = 0
+    key = None
+    started = time.monotonic()
+    # Model output is handed over through a queue so the timeout covers only the
+    # model stream, never the Telegram sends and edits; None marks the end
+    chunks: asyncio.Queue = asyncio.Queue()
+
+    async def produce(chat_session):
+        nonlocal usage
+        first = True
+        async for chunk in await chat_session.send_message_stream(message_text):
+            if getattr(chunk, 'usage_metadata', None):
+                usage = chunk.usage_metadata
+            if chunk.text:
+                if first:
+                    # Time to first chunk is the latency the breaker tracks for streams
+                    breaker.record(True, time.monotonic() - started)
+                    first = False
+                chunks.put_nowait(chunk.text)
+        if first:
+            # The model answered but produced no text (e.g. safety block)
+            breaker.record(True, time.monotonic() - started)
+
+    async def produce_all():
+        nonlocal history_tokens, key
+        try:
+            chat_session, history_tokens, key = await create_session(user_id, save_history, model, route)
+            await run_limited(produce(chat_session), key)
+        finally:
+            chunks.put_nowait(None)
+
+    producer = asyncio.create_task(produce_all())
+    complete = False
+    try:
+        while (piece := await chunks.get()) is not None:
+            text += piece
+            preview = text.strip()
+            if not preview:
+                continue
+
+            now = time.monotonic()
+            if sent is None:
+                sent = await message.reply_text(preview)
+                shown, last_edit = preview, now
+                log_action("DEBUG", f"⚡ First chunk sent ({len(preview)} chars)", user_info)
+            elif now - last_edit >= STREAM_EDIT_INTERVAL and preview != shown:
+                last_edit = now
+                try:
+                    await sent.edit_text(preview)
+                    shown = preview
+                except MessageNotModified:
+                    shown = preview
+                except FloodWait as e:
+                    # Back off edits until the flood wait has passed; the final edit catches up
+                    last_edit = now + e.value
+                    log_action("WARNING", f"⏳ Stream edit FloodWait: {e.value}s", user_info)
+
+        await producer
+        complete = True
+    except asyncio.CancelledError:
+        producer.cancel()
+        breaker.trial = False
+        # Superseded by a newer message: remove the half-written reply
+        if sent is not None:
+            try:
+                await sent.delete()
+            except Exception:
+                pass
+        raise
+    except asyncio.TimeoutError:
+        if not text:
+            breaker.record(False, time.monotonic() - started)
+        log_action("ERROR", f"❌ AI API stream timed out after {AI_TIMEOUT}s", user_info)
+    except Exception as e:
+        if not text:
+            breaker.record(False, time.monotonic() - started)
+        if "cache" in str(e).lower():
+            invalidate_prompt_cache(model, key)
+        log_action("ERROR", f"❌ AI API stream error: {type(e).__name__}: {e}", user_info)
+    finally:
+        if not producer.done():
+            producer.cancel()
+
+    ai_response = text.strip()
+    if not ai_response:
+        log_action("WARNING", "⚠️ AI returned empty stream", user_info)
+        return None
+    if not complete:
+        # Keep what the user already saw, but show it was cut off
+        ai_response += " …"
+
+    try:
+        if sent is None:
+            await message.reply_text(ai_response)
+        elif ai_response != shown:
+            try:
+                await sent.edit_text(ai_response)
+            except MessageNotModified:
+                pass
+            except FloodWait as e:
+                await asyncio.sleep(e.value)
+                await sent.edit_text(ai_response)
+    except Exception as e:
+        log_action("WARNING", f"⚠️ Failed to finalize streamed reply: {type(e).__name__}: {e}", user_info)
+
+    record_tokens(history_tokens, usage, user_info)
+    token_info = ""
+    if usage:
+        prompt_tokens = getattr(usage, 'prompt_token_count', 0) or 0
+        candidate_tokens = getattr(usage, 'candidates_token_count', 0) or 0
+        total_tokens = getattr(usage, 'total_token_count', 0) or 0
+        token_info = f" [Tokens: {prompt_tokens} input + {candidate_tokens} output = {total_tokens} total]"
+    log_action("INFO", f"✅ AI response streamed: '{ai_response}'{token_info}", user_info)
+
+    # A cut-off reply is not written to history, so it never becomes context
+    if save_history and complete:
+        await update_history(user_id, message_text, ai_response)
+
+    return ai_response
@@ -0,0 +1,143 @@
+# Sakura/Chat/clients.py
+import time
+from collections import deque
+from typing import List, Optional
+from google import genai
+from Sakura.Core.config import KEY_COOLDOWN, KEY_RPM, KEY_SYNC_INTERVAL
+from Sakura.Core.logging import logger
+from Sakura.Core.utils import spawn
+from Sakura.Database.keys import get_key, set_key
+from Sakura import state
+
+_last_sync = 0.0
+
+
+def init_clients(api_keys: List[str]) -> int:
+    """Build one Gemini client per API key and make the first one active."""
+    state.gemini_clients = []
+    state.key_stats = []
+    for index, api_key in enumerate(api_keys):
+        try:
+            state.gemini_clients.append(genai.Client(api_key=api_key))
+            state.key_stats.append({"requests": deque(), "errors": 0, "cooldown_until": 0.0})
+        except Exception as e:
+            logger.error(f"❌ Failed to initialize Gemini client for key #{index}: {e}")
+    if state.gemini_clients:
+        select_client(0)
+    return len(state.gemini_clients)
+
+
+def select_client(index: int) -> None:
+    """Make the client for a key index the active one."""
+    state.key_index = index % len(state.gemini_clients)
+    state.gemini_client = state.gemini_clients[state.key_index]
+
+
+def client_for(index: Optional[int]):
+    """The pooled client for a key index, or the active one when no index is given."""
+    if index is None or not state.gemini_clients:
+        return state.gemini_client
+    return state.gemini_clients[index]
+
+
+def requests_per_minute(index: int) -> int:
+    """Requests sent with a key during the last 60 seconds."""
+    requests = state.key_stats[index]["requests"]
+    cutoff = time.monotonic() - 60
+    while requests and requests[0] < cutoff:
+        requests.popleft()
+    return len(requests)
+
+
+def rotate(reason: str) -> None:
+    """Switch to the next key that is not cooling down and share the choice."""
+    count = len(state.gemini_clients)
+    if count < 2:
+        return
+    now = time.monotonic()
+    candidates = [(state.key_index + step) % count for step in range(1, count)]
+    ready = [i for i in candidates if state.key_stats[i]["cooldown_until"] <= now]
+    if ready:
+        index = min(ready, key=requests_per_minute)
+    else:
+        index = min(candidates, key=lambda i: state.key_stats[i]["cooldown_until"])
+
+    logger.warning(f"🔑 Rotating Gemini API key #{state.key_index} → #{index} ({reason})")
+    select_client(index)
+    spawn(set_key(index))
+
+
+def record_request(index: Optional[int] = None) -> int:
+    """Count a request on a key, rotating early when the active key nears its quota.
+
+    Args:
+        index: Key the request has to use, e.g. because it references files
+            uploaded with that key; the active key when None
+
+    Returns:
+        int: The key index the request is sent with
+    """
+    if not state.gemini_clients:
+        return 0
+    if index is None:
+        maybe_sync()
+        if KEY_RPM and requests_per_minute(state.key_index) >= KEY_RPM:
+            rotate(f"{KEY_RPM} requests/min reached")
+        index = state.key_index
+    state.key_stats[index]["requests"].append(time.monotonic())
+    return index
+
+
+def key_ready(index: int) -> bool:
+    """Whether a key exists and is not cooling down after a rate-limit error."""
+    if not state.gemini_clients:
+        return True
+    return index is not None and index < len(state.key_stats) and state.key_stats[index]["cooldown_until"] <= time.monotonic()
+
+
+def record_error(index: int, error: Exception) -> None:
+    """Put a key on cooldown after a rate-limit error and move off it."""
+    if not state.gemini_clients or index >= len(state.key_stats):
+        return
+    message = str(error)
+    if "429" not in message and "quota" not in message.lower() and "RESOURCE_EXHAUSTED" not in message:
+        return
+    stats = state.key_stats[index]
+    stats["errors"] += 1
+    stats["cooldown_until"] = time.monotonic() + KEY_COOLDOWN
+    if index == state.key_index:
+        rotate("rate limited")
+
+
+def maybe_sync() -> None:
+    """Pick up the active key index chosen by other instances, at most every KEY_SYNC_INTERVAL."""
+    global _last_sync
+    if len(state.gemini_clients) < 2:
+        return
+    now = time.monotonic()
+    if now - _last_sync < KEY_SYNC_INTERVAL:
+        return
+    _last_sync = now
+    spawn(sync_key())
+
+
+async def sync_key() -> None:
+    index = await get_key() % len(state.gemini_clients)
+    if index != state.key_index and state.key_stats[index]["cooldown_until"] <= time.monotonic():
+        logger.debug(f"🔑 Following shared Gemini API key index #{index}")
+        select_client(index)
+
+
+def key_summary() -> List[dict]:
+    """Per-key request rate, rate-limit errors and cooldown state."""
+    now = time.monotonic()
+    return [
+        {
+            "index": index,
+            "active": index == state.key_index,
+            "rpm": requests_per_minute(index),
+            "errors": stats["errors"],
+            "cooldown": max(0, round(stats["cooldown_until"] - now)),
+        }
+        for index, stats in enumerate(state.key_stats)
+    ]
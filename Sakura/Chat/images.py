@@ -1,12 +1,22 @@
 # Sakura/Chat/images.py
 import random
+import re
+from typing import Optional, Tuple
 from pyrogram import Client
 from pyrogram.types import Message
-from Sakura.Core.helpers import log_action
+from Sakura.Core.config import MODEL_ROUTES, IMAGE_DESCRIPTION_TOKENS
+from Sakura.Core.helpers import log_action, get_error
+from Sakura.Core.utils import spawn
 from Sakura.Modules.reactions import CONTEXTUAL_REACTIONS
 from Sakura.Modules.effects import animate_reaction
 from Sakura.Modules.typing import send_typing
 from Sakura.Chat.response import get_response
+from Sakura.Chat.media import prepare_image, pick_photo_size, download_image
+from Sakura.Chat.chat import generate, route_config
+from Sakura.Chat.breaker import call_model
+from Sakura.Chat.clients import key_ready
+from Sakura.Database.cache import get_image_description, set_image_description, remember_media, get_recent_media
+from Sakura.Services.scheduler import schedule
 from Sakura import state
 
 IMAGE_ANALYSIS_TRIGGERS = [
@@ -17,6 +27,133 @@ IMAGE_ANALYSIS_TRIGGERS = [
     "kaun si cheez", "kaun sa object", "ye object kya hai", "isme kya object hai", "yeh cheez kya hai"
 ]
 
+# Follow-ups without a reply only reuse the recent image when they name it as a
+# whole word, so "topic" or "imagine" do not count
+RECENT_IMAGE_PATTERN = re.compile(r"\b(?:photo|picture|image|pic|foto|tasveer)s?\b")
+
+# file_unique_ids with a background description running
+_describing: set = set()
+
+DESCRIBE_PROMPT = """Describe this image for someone who cannot see it: the main subject,
+any visible text copied verbatim, the setting and the mood or joke if there is one.
+At most 80 words, plain neutral prose, no opinions."""
+
+
+async def describe_image(image_bytes: bytes, mime_type: str) -> Optional[str]:
+    """Get a short neutral description of an image from the vision model."""
+    image_part = state.llm_backend.inline_part(image_bytes, mime_type)
+
+    async def attempt(model: str):
+        return await generate(
+            model=model,
+            contents=[DESCRIBE_PROMPT, image_part],
+            config=route_config(MODEL_ROUTES["image"], temperature=0.2, max_output_tokens=IMAGE_DESCRIPTION_TOKENS)
+        )
+
+    response = await call_model(attempt, primary=MODEL_ROUTES["image"]["model"])
+    return response.text.strip() if response.text else None
+
+
+async def load_image(client: Client, photo, user_info: dict, describe: bool = True, fetch=None) -> Tuple[Optional[str], Optional[bytes], str]:
+    """Resolve a photo to a cached description, or failing that to its bytes.
+
+    A miss is answered with the image itself in a single call, while a
+    background task describes it and caches the description by
+    file_unique_id, so forwards of the same image elsewhere only cost a text
+    call. With describe=False a miss just returns the bytes. For other media,
+    fetch is an async callable returning (bytes, MIME type) or None.
+
+    Returns:
+        tuple: (description, image bytes, MIME type); description is set when
+        the image can be passed as text, otherwise the bytes are
+    """
+    description = await get_image_description(photo.file_unique_id)
+    if description:
+        log_action("DEBUG", "🖼️ Using cached image description", user_info)
+        return description, None, "image/jpeg"
+
+    prepared = await (fetch() if fetch else prepare_image(client, photo))
+    if not prepared:
+        return None, None, "image/jpeg"
+    image_bytes, mime_type = prepared
+    if describe and photo.file_unique_id not in _describing:
+        _describing.add(photo.file_unique_id)
+        spawn(cache_description(photo.file_unique_id, image_bytes, mime_type, user_info))
+    return None, image_bytes, mime_type
+
+
+async def cache_description(file_unique_id: str, image_bytes: bytes, mime_type: str, user_info: dict) -> None:
+    """Describe an image off the reply path and cache it for later sightings."""
+    try:
+        description = await describe_image(image_bytes, mime_type)
+        if description:
+            await set_image_description(file_unique_id, description)
+            log_action("DEBUG", "🖼️ Image description cached", user_info)
+    except Exception as e:
+        log_action("WARNING", f"⚠️ Image description failed: {e}", user_info)
+    finally:
+        _describing.discard(file_unique_id)
+
+
+async def index_photo(user_id: int, photo) -> None:
+    """Add a photo to the user's recent-media index for later follow-ups."""
+    file_id, width, height = pick_photo_size(photo)
+    await remember_media(user_id, {
+        "file_unique_id": photo.file_unique_id,
+        "file_id": file_id,
+        "width": width,
+        "height": height,
+    })
+
+
+async def load_recent_image(client: Client, entry: dict, user_info: dict) -> Tuple[Optional[str], Optional[object], Optional[int]]:
+    """Resolve a recent-media entry to text or a reusable part, cheapest first.
+
+    A cached description avoids the image entirely; a still-valid upload
+    handle avoids downloading and uploading it again. Otherwise the image is
+    downloaded once, uploaded with the active key, and the handle stored on
+    the entry. Uploaded files only work with the key they were uploaded
+    with, so that key is returned for the request to be pinned to.
+
+    Returns:
+        tuple: (description, part, key); description or part is set, or both
+        are None; key is set when part is an uploaded file
+    """
+    description = await get_image_description(entry["file_unique_id"])
+    if description:
+        return description, None, None
+
+    handle = entry.get("handle")
+    key = handle.get("key") if handle else None
+    part = state.llm_backend.file_part(handle, key) if handle and key_ready(key) else None
+    if part is not None:
+        log_action("DEBUG", "♻️ Reusing uploaded image handle", user_info)
+        return None, part, key
+
+    prepared = await download_image(client, entry["file_id"], entry["width"], entry["height"])
+    if not prepared:
+        return None, None, None
+    image_bytes, mime_type = prepared
+    key = state.key_index
+    try:
+        handle = await state.llm_backend.upload(image_bytes, mime_type, key)
+    except Exception as e:
+        log_action("WARNING", f"⚠️ Image upload failed, sending inline: {e}", user_info)
+        handle = None
+    if handle:
+        await remember_media(user_info["user_id"], {**entry, "handle": handle})
+        part = state.llm_backend.file_part(handle, key)
+    if part is None:
+        return None, state.llm_backend.inline_part(image_bytes, mime_type), None
+    return None, part, key
+
+
+def image_prompt(caption: str, description: str, label: str = "Image") -> str:
+    """Text stand-in for an image message, built from its description."""
+    prompt = f"[{label}: {description}]"
+    return f"{prompt}\n{caption}" if caption else prompt
+
+
 async def reply_image(client: Client, message: Message, user_message: str, user_info: dict) -> bool:
     """Check if user is asking to analyze a previously sent image and handle it"""
     message_lower = user_message.lower()
@@ -50,18 +187,22 @@ async def reply_image(client: Client, message: Message, user_message: str, user_
 
         try:
             photo = message.reply_to_message.photo
-            image_stream = await client.download_media(photo.file_id, in_memory=True)
-            image_bytes = image_stream.getvalue()
-
             caption = message.reply_to_message.caption or ""
 
-            response = await get_response(
-                user_message=caption,
-                user_id=user_info["user_id"],
-                user_name=user_info.get("first_name", "User"),
-                user_info=user_info,
-                image_bytes=image_bytes
-            )
+            async def analyze():
+                description, image_bytes, mime_type = await load_image(client, photo, user_info)
+                if not description and not image_bytes:
+                    return None
+                return await get_response(
+                    user_message=image_prompt(caption, description) if description else caption,
+                    user_id=user_info["user_id"],
+                    user_name=user_info.get("first_name", "User"),
+                    user_info=user_info,
+                    image_bytes=image_bytes,
+                    mime_type=mime_type
+                )
+
+            response = await schedule(user_info, analyze()) or get_error()
 
             await message.reply_text(response)
 
@@ -74,13 +215,36 @@ async def reply_image(client: Client, message: Message, user_message: str, user_
             await message.reply_text(error_response)
             return True
 
-    if user_info["user_id"] in state.conversation_history:
-        history = state.conversation_history[user_info["user_id"]]
-        for msg in reversed(history):
-            if msg["role"] == "user" and "[Image:" in msg["content"]:
-                log_action("INFO", "🔍 User asking about previously sent image from history", user_info)
-                no_image_response = "Koi recent image nahi mil rahi analyze karne ke liye 😔"
-                await message.reply_text(no_image_response)
-                return True
+    if not RECENT_IMAGE_PATTERN.search(message_lower):
+        return False
+
+    recent = await get_recent_media(user_info["user_id"])
+    if not recent:
+        return False
+
+    log_action("INFO", "🔍 User asking about their most recent image", user_info)
+    await send_typing(client, message.chat.id, user_info)
+
+    async def analyze():
+        description, part, key = await load_recent_image(client, recent[0], user_info)
+        if not description and part is None:
+            return None
+        return await get_response(
+            user_message=image_prompt(user_message, description) if description else user_message,
+            user_id=user_info["user_id"],
+            user_name=user_info.get("first_name", "User"),
+            user_info=user_info,
+            images=[part] if part is not None else None,
+            key=key
+        )
 
-    return False
+    try:
+        response = await schedule(user_info, analyze())
+        if not response:
+            response = "Koi recent image nahi mil rahi analyze karne ke liye 😔"
+        await message.reply_text(response)
+        log_action("INFO", "✅ Recent image analyzed successfully", user_info)
+    except Exception as e:
+        log_action("ERROR", f"❌ Error analyzing recent image: {e}", user_info)
+        await message.reply_text("Image analyze nahi kar paa rahi 😔")
+    return True
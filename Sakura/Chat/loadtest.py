@@ -0,0 +1,167 @@
+# Sakura/Chat/loadtest.py
+"""Drive the message handler end to end against the mock LLM server.
+
+Synthetic users send private text messages through handle_messages, the same
+entry point Telegram updates use, with stand-ins for the Pyrogram client and
+messages. Valkey and the database are used when configured, otherwise the
+memory fallbacks apply.
+
+    python -m Sakura.Chat.mockserver --latency lognormal:0.8,0.5
+    MOCK_LLM_URL=http://127.0.0.1:8089 python -m Sakura.Chat.loadtest --users 200 --messages 5
+"""
+import argparse
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+from pyrogram.enums import ChatType
+from Sakura.Core.config import MOCK_LLM_URL, AI_CONCURRENCY, VALKEY_URL
+from Sakura.Core.logging import logger
+from Sakura.Chat.backends import create_backend
+from Sakura.Database.valkey import connect_cache, close_cache
+from Sakura.Modules.handlers import handle_messages
+from Sakura import state
+
+TEXTS = (
+    "hey how was your day", "what should i cook tonight", "tell me something fun",
+    "i can't sleep again", "do you like rainy weather", "recommend me a song",
+    "explain black holes simply", "my exam went badly today"
+)
+
+
+class FakeSent:
+    """A sent message: the handler edits streamed replies into it."""
+
+    def __init__(self, run, text: str):
+        self.run = run
+        self.text = text
+
+    async def edit_text(self, text: str, **kwargs):
+        self.text = text
+        return self
+
+    async def delete(self):
+        return True
+
+
+class FakeMessage:
+    """Incoming text message; media fields the handler checks read as None."""
+
+    def __init__(self, run, user, chat, message_id: int, text: str):
+        self.run = run
+        self.id = message_id
+        self.from_user = user
+        self.chat = chat
+        self.text = text
+
+    def __getattr__(self, name):
+        return None
+
+    async def reply_text(self, text: str, **kwargs):
+        self.run.reply(self)
+        return FakeSent(self.run, text)
+
+    async def reply_voice(self, *args, **kwargs):
+        self.run.reply(self)
+        return FakeSent(self.run, "")
+
+
+class FakeClient:
+    """The few Client calls made on the text path."""
+
+    def __init__(self):
+        self.me = SimpleNamespace(id=1, username="sakura_loadtest_bot")
+
+    async def send_chat_action(self, *args, **kwargs):
+        return True
+
+    async def send_message(self, *args, **kwargs):
+        return SimpleNamespace(id=0)
+
+
+class LoadRun:
+    def __init__(self):
+        self.sent_at = {}
+        self.latencies = []
+        self.replies = 0
+        self.failures = 0
+
+    def reply(self, message: FakeMessage) -> None:
+        """Record the time to the first reply for a message."""
+        self.replies += 1
+        started = self.sent_at.pop(message.id, None)
+        if started is not None:
+            self.latencies.append(time.monotonic() - started)
+
+
+def make_user(user_id: int):
+    user = SimpleNamespace(
+        id=user_id, is_self=False, is_bot=False, username=f"load{user_id}",
+        first_name="Load", last_name=str(user_id)
+    )
+    user.full_name = f"{user.first_name} {user.last_name}"
+    chat = SimpleNamespace(
+        id=user_id, type=ChatType.PRIVATE, title=None,
+        first_name=user.first_name, username=user.username
+    )
+    return user, chat
+
+
+async def run_user(run: LoadRun, client: FakeClient, user_id: int, args) -> None:
+    user, chat = make_user(user_id)
+    for n in range(args.messages):
+        message = FakeMessage(run, user, chat, user_id * 1000 + n, random.choice(TEXTS))
+        run.sent_at[message.id] = time.monotonic()
+        try:
+            await handle_messages(client, message)
+        except Exception as e:
+            run.failures += 1
+            logger.error(f"❌ Load test message failed: {e}")
+        await asyncio.sleep(random.expovariate(1 / args.interval))
+
+
+def percentile(values: list, share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+async def main_async(args) -> None:
+    state.llm_backend = create_backend("mock", args.url)
+    state.gemini_semaphore = asyncio.Semaphore(AI_CONCURRENCY)
+    if VALKEY_URL:
+        await connect_cache()
+
+    run = LoadRun()
+    client = FakeClient()
+    started = time.monotonic()
+    await asyncio.gather(*(
+        run_user(run, client, 100000 + i, args) for i in range(args.users)
+    ))
+    elapsed = time.monotonic() - started
+    if state.llm_backend.session:
+        await state.llm_backend.session.close()
+    if VALKEY_URL:
+        await close_cache()
+
+    sent = args.users * args.messages
+    logger.info(f"📊 {sent} messages from {args.users} users in {elapsed:.1f}s: "
+                f"{run.replies} replies, {len(run.sent_at)} unanswered or merged, {run.failures} failed")
+    if run.latencies:
+        logger.info(
+            f"⏱️ Time to first reply: p50 {percentile(run.latencies, 0.5):.2f}s, "
+            f"p95 {percentile(run.latencies, 0.95):.2f}s, p99 {percentile(run.latencies, 0.99):.2f}s"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run synthetic messages through the Sakura handlers")
+    parser.add_argument("--url", default=MOCK_LLM_URL, help="Mock LLM server URL")
+    parser.add_argument("--users", type=int, default=50, help="Concurrent synthetic users")
+    parser.add_argument("--messages", type=int, default=3, help="Messages per user")
+    parser.add_argument("--interval", type=float, default=5.0, help="Mean seconds between a user's messages")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
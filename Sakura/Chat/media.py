@@ -0,0 +1,213 @@
+# Sakura/Chat/media.py
+import asyncio
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Optional, Tuple
+from pyrogram import Client
+from Sakura.Core.config import (
+    IMAGE_TARGET_SIZE, IMAGE_MAX_BYTES, IMAGE_QUALITY, IMAGE_WORKERS, MEDIA_DOWNLOADS,
+    MEDIA_MAX_BYTES, KEYFRAME_TIMEOUT
+)
+from Sakura.Core.logging import logger
+
+# Pillow is optional; without it images are sent at the picked size as-is
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+_executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="image")
+# Caps concurrent media downloads so large albums and bursts cannot flood the connection
+_downloads: Optional[asyncio.Semaphore] = None
+
+MAGIC_NUMBERS = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+
+
+def download_slots() -> asyncio.Semaphore:
+    global _downloads
+    if _downloads is None:
+        _downloads = asyncio.Semaphore(MEDIA_DOWNLOADS)
+    return _downloads
+
+
+def detect_mime(data: bytes) -> str:
+    """Detect an image's MIME type from its leading bytes, defaulting to JPEG."""
+    head = memoryview(data)[:16].tobytes()
+    for magic, mime in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return mime
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:12] in (b"ftypheic", b"ftypheix", b"ftypmif1"):
+        return "image/heic"
+    return "image/jpeg"
+
+
+def pick_photo_size(photo, target: int = IMAGE_TARGET_SIZE) -> Tuple[str, int, int]:
+    """Pick the smallest available size of a photo whose longest side reaches target.
+
+    Telegram keeps several sizes per photo: the largest is the Photo itself,
+    the smaller ones are its thumbs. Falls back to the largest size when none
+    is big enough.
+
+    Returns:
+        tuple: (file_id, width, height)
+    """
+    sizes = [(photo.file_id, photo.width or 0, photo.height or 0)]
+    for thumb in getattr(photo, "thumbs", None) or []:
+        if getattr(thumb, "file_id", None):
+            sizes.append((thumb.file_id, thumb.width or 0, thumb.height or 0))
+
+    large_enough = [size for size in sizes if max(size[1], size[2]) >= target]
+    if large_enough:
+        return min(large_enough, key=lambda size: size[1] * size[2])
+    return max(sizes, key=lambda size: size[1] * size[2])
+
+
+def _downscale(data: bytes, target: int, quality: int) -> Optional[bytes]:
+    """Shrink an image to fit target x target and re-encode it as JPEG (runs in a worker)."""
+    with Image.open(BytesIO(data)) as image:
+        image.draft("RGB", (target, target))
+        image.thumbnail((target, target))
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        output = BytesIO()
+        image.save(output, format="JPEG", quality=quality, optimize=True)
+    return output.getvalue()
+
+
+async def prepare_image(client: Client, photo) -> Optional[Tuple[bytes, str]]:
+    """Download a photo at the right size and get it ready for the model.
+
+    The downloaded bytes are passed through untouched unless they are still
+    bigger than IMAGE_TARGET_SIZE / IMAGE_MAX_BYTES, in which case they are
+    resized and recompressed off the event loop.
+
+    Returns:
+        tuple: (image bytes, MIME type)
+        None: If the download failed
+    """
+    file_id, width, height = pick_photo_size(photo)
+    return await download_image(client, file_id, width, height)
+
+
+async def download_image(client: Client, file_id: str, width: int, height: int) -> Optional[Tuple[bytes, str]]:
+    """Download one image size by file_id and downscale it if still oversized.
+
+    Returns:
+        tuple: (image bytes, MIME type)
+        None: If the download failed
+    """
+    async with download_slots():
+        image_file = await client.download_media(file_id, in_memory=True)
+    if not image_file:
+        return None
+    # getvalue() hands over BytesIO's buffer; the same object is passed on from here
+    data = image_file.getvalue()
+    mime_type = detect_mime(data)
+
+    oversized = max(width, height) > IMAGE_TARGET_SIZE * 1.25 or len(data) > IMAGE_MAX_BYTES
+    if not oversized or Image is None or mime_type == "image/gif":
+        logger.debug(f"🖼️ Image ready: {width}x{height}, {len(data)} bytes, {mime_type}")
+        return data, mime_type
+
+    try:
+        loop = asyncio.get_running_loop()
+        resized = await loop.run_in_executor(_executor, _downscale, data, IMAGE_TARGET_SIZE, IMAGE_QUALITY)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not downscale image, sending original: {e}")
+        return data, mime_type
+
+    if len(resized) >= len(data):
+        return data, mime_type
+    logger.debug(f"🖼️ Image downscaled: {width}x{height}, {len(data)} → {len(resized)} bytes")
+    return resized, "image/jpeg"
+
+
+def get_media(message):
+    """The GIF, video note or document of a message, with a label for prompts.
+
+    Returns:
+        tuple: (media object, label), or (None, None) for other messages
+    """
+    if message.animation:
+        return message.animation, "GIF"
+    if message.video_note:
+        return message.video_note, "Video note"
+    if message.document:
+        return message.document, "File"
+    return None, None
+
+
+async def extract_keyframe(client: Client, media) -> Optional[Tuple[bytes, str]]:
+    """Grab the first frame of a small video file with ffmpeg.
+
+    Returns:
+        tuple: (JPEG bytes, "image/jpeg")
+        None: If ffmpeg is missing or extraction failed
+    """
+    if not shutil.which("ffmpeg"):
+        return None
+
+    path = os.path.join(tempfile.gettempdir(), f"sakura_{media.file_unique_id}")
+    try:
+        async with download_slots():
+            path = await client.download_media(media.file_id, file_name=path)
+        if not path:
+            return None
+
+        process = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-v", "error", "-i", path, "-frames:v", "1",
+            "-vf", f"scale='min({IMAGE_TARGET_SIZE},iw)':-2",
+            "-f", "image2", "-c:v", "mjpeg", "pipe:1",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        try:
+            frame, _ = await asyncio.wait_for(process.communicate(), timeout=KEYFRAME_TIMEOUT)
+        except asyncio.TimeoutError:
+            process.kill()
+            return None
+        return (frame, "image/jpeg") if frame else None
+    except Exception as e:
+        logger.warning(f"⚠️ Keyframe extraction failed: {e}")
+        return None
+    finally:
+        if path and os.path.exists(path):
+            os.remove(path)
+
+
+async def prepare_media(client: Client, media) -> Optional[Tuple[bytes, str]]:
+    """Get an image for a GIF, video note or document without fetching large files.
+
+    Image documents of known size under MEDIA_MAX_BYTES are used as they are.
+    Otherwise, including when Telegram reports no size, the thumbnail is
+    used, and only small files without one are downloaded to pull a single
+    keyframe.
+
+    Returns:
+        tuple: (image bytes, MIME type)
+        None: If no image can be had within the size caps
+    """
+    mime_type = getattr(media, "mime_type", "") or ""
+    file_size = getattr(media, "file_size", 0) or 0
+    if mime_type.startswith("image/") and mime_type != "image/gif" and 0 < file_size <= MEDIA_MAX_BYTES:
+        return await download_image(client, media.file_id, getattr(media, "width", 0) or 0, getattr(media, "height", 0) or 0)
+
+    thumbs = [thumb for thumb in getattr(media, "thumbs", None) or [] if getattr(thumb, "file_id", None)]
+    if thumbs:
+        thumb = max(thumbs, key=lambda t: (t.width or 0) * (t.height or 0))
+        return await download_image(client, thumb.file_id, thumb.width or 0, thumb.height or 0)
+
+    is_video = mime_type.startswith("video/") or mime_type == "image/gif"
+    if is_video and 0 < file_size <= MEDIA_MAX_BYTES:
+        return await extract_keyframe(client, media)
+    return None
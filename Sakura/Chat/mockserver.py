@@ -0,0 +1,128 @@
+# Sakura/Chat/mockserver.py
+"""Local stand-in for the LLM API, for benchmarks and load tests.
+
+Run it and point the bot at it:
+
+    python -m Sakura.Chat.mockserver --latency lognormal:0.8,0.5 --error-rate 0.02
+    LLM_BACKEND=mock MOCK_LLM_URL=http://127.0.0.1:8089 python -m Sakura
+
+or drive the handlers with synthetic users instead of Telegram (see loadtest.py):
+
+    MOCK_LLM_URL=http://127.0.0.1:8089 python -m Sakura.Chat.loadtest --users 200
+
+Latency specs: fixed:S, uniform:MIN,MAX, normal:MEAN,STD, lognormal:MEDIAN,SIGMA
+(all in seconds). For streamed requests the latency is the time to first chunk.
+"""
+import argparse
+import asyncio
+import math
+import random
+import orjson
+from aiohttp import web
+
+WORDS = (
+    "hey", "sure", "that", "sounds", "nice", "honestly", "maybe", "you", "should",
+    "try", "it", "again", "tomorrow", "haha", "what", "do", "think", "about", "this"
+)
+
+
+def parse_latency(spec: str):
+    """Turn a latency spec into a callable returning seconds."""
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda: max(0.0, random.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class MockLLM:
+    def __init__(self, args):
+        self.latency = parse_latency(args.latency)
+        self.error_rate = args.error_rate
+        self.rate_limit_rate = args.rate_limit_rate
+        self.output_tokens = args.output_tokens
+        self.chunk_words = args.chunk_words
+        self.chunk_delay = args.chunk_delay
+        self.served = 0
+
+    def _failure(self):
+        roll = random.random()
+        if roll < self.rate_limit_rate:
+            return web.json_response({"error": "RESOURCE_EXHAUSTED mock quota exceeded"}, status=429)
+        if roll < self.rate_limit_rate + self.error_rate:
+            return web.json_response({"error": "INTERNAL mock server error"}, status=500)
+        return None
+
+    def _reply(self, body: dict):
+        # Roughly 4 characters per token on the way in, ~1 token per word out
+        prompt_tokens = (body.get("history_chars", 0) + len(body.get("text", ""))) // 4 + 258 * body.get("images", 0)
+        if body.get("system"):
+            prompt_tokens += 1500
+        wanted = max(1, int(random.uniform(0.5, 1.5) * self.output_tokens))
+        limit = body.get("max_output_tokens") or wanted
+        tokens = min(wanted, limit)
+        usage = {
+            "prompt_token_count": prompt_tokens,
+            "candidates_token_count": tokens,
+            "thoughts_token_count": 0,
+            "total_token_count": prompt_tokens + tokens,
+        }
+        words = [random.choice(WORDS) for _ in range(tokens)]
+        return words, usage, "MAX_TOKENS" if wanted > limit else "STOP"
+
+    async def generate(self, request: web.Request):
+        body = orjson.loads(await request.read())
+        await asyncio.sleep(self.latency())
+        failure = self._failure()
+        if failure is not None:
+            return failure
+
+        self.served += 1
+        words, usage, finish_reason = self._reply(body)
+        if not body.get("stream"):
+            return web.json_response(
+                {"text": " ".join(words), "usage": usage, "finish_reason": finish_reason},
+                dumps=lambda obj: orjson.dumps(obj).decode()
+            )
+
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        for start in range(0, len(words), self.chunk_words):
+            chunk = " ".join(words[start:start + self.chunk_words]) + " "
+            await response.write(orjson.dumps({"text": chunk}) + b"\n")
+            await asyncio.sleep(self.chunk_delay)
+        await response.write(orjson.dumps({"text": "", "usage": usage, "finish_reason": finish_reason}) + b"\n")
+        await response.write_eof()
+        return response
+
+    async def health(self, request: web.Request):
+        return web.json_response({"served": self.served})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mock LLM server for Sakura load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", default="lognormal:0.8,0.4", help="Latency distribution spec")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--output-tokens", type=int, default=60, help="Mean output tokens per reply")
+    parser.add_argument("--chunk-words", type=int, default=8, help="Words per streamed chunk")
+    parser.add_argument("--chunk-delay", type=float, default=0.05, help="Seconds between streamed chunks")
+    args = parser.parse_args()
+
+    mock = MockLLM(args)
+    app = web.Application()
+    app.router.add_post("/generate", mock.generate)
+    app.router.add_get("/", mock.health)
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
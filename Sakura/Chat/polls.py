@@ -1,14 +1,25 @@
 # Sakura/Chat/polls.py
+import asyncio
+import hashlib
 import random
-from typing import Dict
+import re
+import unicodedata
+import orjson
+from typing import Dict, Optional
 from pyrogram import Client
 from pyrogram.types import Message
+from Sakura.Core.config import MODEL_ROUTES
 from Sakura.Core.helpers import log_action
 from Sakura.Modules.effects import animate_reaction
 from Sakura.Modules.reactions import CONTEXTUAL_REACTIONS
 from Sakura.Modules.typing import send_typing
-from Sakura.Database.conversation import add_history
-from Sakura.Chat.chat import get_response
+from Sakura.Database.conversation import update_history
+from Sakura.Database.cache import get_poll_answer, set_poll_answer
+from Sakura.Chat.chat import get_response, generate, route_config
+from Sakura.Chat.breaker import call_model
+from Sakura.Chat.prompts import SAKURA_PROMPT
+from Sakura.Services.scheduler import schedule
+from Sakura import state
 
 POLL_ANALYSIS_TRIGGERS = [
     "poll", "polls", "question", "questions", "query", "queries", "quiz", "quiz question",
@@ -21,6 +32,97 @@ POLL_ANALYSIS_TRIGGERS = [
     "kaunsa galat", "kaunsa option", "kaunsa choice"
 ]
 
+POLL_SOLVE_PROMPT = """Poll Question: "{question}"
+
+Options:
+{options}
+
+Which option do you think is correct and why? Answer as JSON:
+{{"answer": <option number>, "reason": "<your reply to the user on briefly why; never mention the option's number>"}}"""
+
+# Poll analyses in flight, so concurrent misses for the same poll share one model call
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+def normalise(text: str) -> str:
+    """Fold case, Unicode form, whitespace and trailing punctuation of poll text."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return re.sub(r"\s+", " ", text).strip(" .?!:")
+
+
+def poll_key(poll_question: str, poll_options: list) -> str:
+    """Hash a poll by its normalised question and options.
+
+    Case, Unicode form, whitespace and option order are ignored, so the same
+    quiz forwarded into many groups maps to a single key. The cached answer
+    is therefore stored by option text and positioned by poll_reply.
+    """
+    parts = [normalise(poll_question)] + sorted(normalise(option) for option in poll_options)
+    return hashlib.blake2b("\x1f".join(parts).encode(), digest_size=16).hexdigest()
+
+
+def poll_reply(answer: dict, poll_options: list) -> str:
+    """Reply for a solved poll, numbering the answer by its place in this poll's option order."""
+    options = [normalise(option) for option in poll_options]
+    target = normalise(answer["answer"])
+    if target in options:
+        index = options.index(target)
+        return f"{index + 1}. {poll_options[index].strip()} ✅\n{answer['reason']}"
+    return f"{answer['answer']} ✅\n{answer['reason']}"
+
+
+async def solve_poll(poll_question: str, poll_options: list) -> Optional[dict]:
+    """Ask the model once for a poll's answer and an in-persona reason, and cache them.
+
+    The reason never refers to option numbers, as the same cached answer
+    serves copies of the poll with the options in another order.
+
+    Returns:
+        dict: {"answer": option text, "reason": reason text}
+        None: If the model's answer could not be used
+    """
+    options_text = "\n".join(f"{i + 1}. {option}" for i, option in enumerate(poll_options))
+    route = MODEL_ROUTES["poll"]
+
+    async def attempt(model: str):
+        return await generate(
+            model=model,
+            contents=POLL_SOLVE_PROMPT.format(question=poll_question, options=options_text),
+            config=route_config(
+                route,
+                system_instruction=SAKURA_PROMPT,
+                temperature=0.3,
+                max_output_tokens=route["max_output_tokens"],
+                response_mime_type="application/json",
+            )
+        )
+
+    response = await call_model(attempt, primary=route["model"])
+    try:
+        data = orjson.loads(response.text)
+        index = int(data["answer"]) - 1
+        reason = str(data["reason"]).strip()
+    except Exception:
+        return None
+    if not 0 <= index < len(poll_options) or not reason:
+        return None
+
+    answer = {"answer": poll_options[index], "reason": reason}
+    await set_poll_answer(poll_key(poll_question, poll_options), answer)
+    return answer
+
+
+async def single_flight(key: str, factory):
+    """Run factory() once per key; concurrent callers await the same result."""
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(factory())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shielded so one caller giving up does not cancel the others
+    return await asyncio.shield(task)
+
+
 async def reply_poll(client: Client, message: Message, user_message: str, user_info: dict) -> bool:
     """Check if user is asking to analyze a previously sent poll and handle it"""
     message_lower = user_message.lower()
@@ -78,6 +180,24 @@ async def analyze_poll(poll_question: str, poll_options: list, user_info: Dict[s
         log_action("DEBUG", f"📊 Analyzing poll: '{poll_question}'", user_info)
 
     try:
+        key = poll_key(poll_question, poll_options)
+        cached = await get_poll_answer(key)
+        if cached:
+            log_action("DEBUG", "📊 Poll answer served from cache", user_info)
+        elif state.llm_backend:
+            try:
+                cached = await single_flight(key, lambda: schedule(user_info, solve_poll(poll_question, poll_options)))
+            except Exception as e:
+                log_action("WARNING", f"⚠️ Structured poll analysis failed: {e}", user_info)
+
+        poll_description = f"[Poll: {poll_question}] Options: {', '.join(poll_options)}"
+        if cached:
+            reply = poll_reply(cached, poll_options)
+            await update_history(user_id, poll_description, reply)
+            log_action("INFO", f"✅ Poll answered: '{cached['answer']}'", user_info)
+            return reply
+
+        # Free-form analysis when the structured answer was unusable
         options_text = "\n".join([f"{i + 1}. {option}" for i, option in enumerate(poll_options)])
 
         poll_prompt_message = f"""Poll Question: "{poll_question}"
@@ -87,16 +207,15 @@ Options:
 
 Which option do you think is correct and why?"""
 
-        response = await get_response(
+        response = await schedule(user_info, get_response(
             user_message=poll_prompt_message,
             user_id=user_id,
-            user_info=user_info
-        )
+            user_info=user_info,
+            kind="poll",
+            history_text=poll_description
+        ))
 
         if response:
-            poll_description = f"[Poll: {poll_question}] Options: {', '.join(poll_options)}"
-            await add_history(user_id, poll_description, is_user=True)
-            await add_history(user_id, response, is_user=False)
             log_action("INFO", "✅ Poll analysis completed and saved to history", user_info)
             return response
         else:
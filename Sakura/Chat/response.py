@@ -3,7 +3,6 @@ from typing import Optional, Dict
 
 from Sakura.Chat.chat import get_response as _get_chat_response
 from Sakura.Core.helpers import get_error, log_action
-from Sakura.Database.conversation import add_history
 
 
 async def get_response(
@@ -11,7 +10,9 @@ async def get_response(
     user_name: str,
     user_info: Dict[str, any],
     user_id: int,
-    image_bytes: Optional[bytes] = None
+    image_bytes: Optional[bytes] = None,
+    mime_type: str = "image/jpeg",
+    images: Optional[list] = None
 ) -> str:
     """Gets a response from the AI.
     
@@ -24,12 +25,22 @@ async def get_response(
         user_info: Dictionary containing user information
         user_id: The user's ID
         image_bytes: Optional image bytes if user sent an image
+        mime_type: MIME type of image_bytes
+        images: Further images as (bytes, MIME type) pairs or ready-made backend parts
         
     Returns:
         str: The AI response or an error message (never None)
     """
     try:
-        response = await _get_chat_response(user_message, user_id, user_info, image_bytes)
+        # The chat layer records the turn, labelled as an image when one was sent
+        history_user_message = user_message
+        if image_bytes or images:
+            history_user_message = f"[Image: {user_message}]" if user_message else "[Image sent]"
+
+        response = await _get_chat_response(
+            user_message, user_id, user_info, image_bytes,
+            mime_type=mime_type, images=images, history_text=history_user_message
+        )
 
         # If response is None or empty, return error message
         if not response:
@@ -38,15 +49,6 @@ async def get_response(
             # Don't save failed responses to history
             return error_msg if error_msg else "Sorry, I'm having trouble responding right now."
 
-        # Prepare message for history
-        history_user_message = user_message
-        if image_bytes:
-            history_user_message = f"[Image: {user_message}]" if user_message else "[Image sent]"
-
-        # Add to history
-        await add_history(user_id, history_user_message, is_user=True)
-        await add_history(user_id, response, is_user=False)
-        
         return response
 
     except Exception as e:
@@ -0,0 +1,75 @@
+# Sakura/Chat/summary.py
+import asyncio
+from typing import Dict
+from Sakura.Core.config import MODEL_ROUTES
+from Sakura.Core.logging import logger
+from Sakura.Database.conversation import get_summary, set_summary
+from Sakura.Chat.chat import generate, route_config
+from Sakura.Chat.breaker import call_model
+from Sakura.Services.scheduler import schedule
+from Sakura import state
+
+SUMMARY_PROMPT = """You keep a short running memory of a chat between a user and Sakura.
+Update the summary with the new turns below. Keep names, facts about the user,
+preferences, plans and open questions; drop small talk. Write at most 80 words
+in plain third person, in the language the user mostly uses.
+
+Current summary:
+{summary}
+
+New turns:
+{turns}
+
+Updated summary:"""
+
+_locks: Dict[int, asyncio.Lock] = {}
+# Summarisations running or waiting per user; the lock is dropped when none are left
+_pending: Dict[int, int] = {}
+
+
+async def summarize_history(user_id: int, evicted: list) -> None:
+    """Fold turns evicted from the history window into the user's running summary.
+
+    Runs in the scheduler's background lane, behind every user request, and
+    through the circuit breaker on its own route.
+    """
+    if not state.llm_backend or not evicted:
+        return
+
+    # Serialise per user so two batches never overwrite each other's summary
+    lock = _locks.setdefault(user_id, asyncio.Lock())
+    _pending[user_id] = _pending.get(user_id, 0) + 1
+    try:
+        async with lock:
+            summary = await get_summary(user_id) or "(none yet)"
+            turns = "\n".join(
+                f"{'User' if msg['role'] == 'user' else 'Sakura'}: {msg['content']}"
+                for msg in evicted
+            )
+            route = MODEL_ROUTES["summary"]
+
+            async def attempt(model: str):
+                return await generate(
+                    model=model,
+                    contents=SUMMARY_PROMPT.format(summary=summary, turns=turns),
+                    config=route_config(route, temperature=0.2, max_output_tokens=route["max_output_tokens"])
+                )
+
+            response = await schedule({"user_id": user_id}, call_model(attempt, primary=route["model"]), lane="background")
+            if response is None:
+                logger.warning(f"⚠️ Summary queue full, keeping the previous summary for user {user_id}")
+                return
+            new_summary = response.text.strip() if response.text else None
+            if not new_summary:
+                logger.warning(f"⚠️ Empty summary returned for user {user_id}, keeping previous one")
+                return
+
+            await set_summary(user_id, new_summary)
+            logger.debug(f"📝 Folded {len(evicted)} turns into summary for user {user_id}")
+    except Exception as e:
+        logger.error(f"❌ Failed to summarise history for user {user_id}: {e}")
+    finally:
+        _pending[user_id] -= 1
+        if not _pending[user_id]:
+            del _pending[user_id]
+            _locks.pop(user_id, None)
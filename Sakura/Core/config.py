@@ -9,7 +9,96 @@ VALKEY_URL = os.getenv("VALKEY_URL", "")
 OWNER_ID = int(os.getenv("OWNER_ID", "0"))
 DATABASE_URL = os.getenv("DATABASE_URL", "")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+GEMINI_API_KEYS = [key.strip() for key in os.getenv("GEMINI_API_KEYS", GEMINI_API_KEY).split(",") if key.strip()]
+KEY_COOLDOWN = 60
+KEY_RPM = int(os.getenv("KEY_RPM", "0"))
+KEY_SYNC_INTERVAL = 10
+# "gemini", or "mock" to talk to the local load-test server (python -m Sakura.Chat.mockserver)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").lower()
+MOCK_LLM_URL = os.getenv("MOCK_LLM_URL", "http://127.0.0.1:8089")
 AI_MODEL = os.getenv("AI_MODEL", "gemini-2.5-flash-lite")
+FALLBACK_MODEL = os.getenv("FALLBACK_MODEL", "")
+HEDGING = os.getenv("HEDGING", "false").lower() == "true"
+BREAKER_WINDOW = 20
+BREAKER_MIN_CALLS = 10
+BREAKER_ERROR_RATE = 0.5
+BREAKER_LATENCY = float(os.getenv("BREAKER_LATENCY", "20"))
+BREAKER_COOLDOWN = 30
+# Per message-class model and budgets. Thinking budgets are tuned for AI_MODEL:
+# a route whose model is overridden keeps that model's default unless
+# <ROUTE>_THINKING_BUDGET is set ("none" also keeps the default)
+def _route(name: str, max_output_tokens: int, thinking_budget: int) -> dict:
+    model = os.getenv(f"{name}_MODEL", AI_MODEL)
+    budget = os.getenv(f"{name}_THINKING_BUDGET")
+    if budget is not None:
+        thinking_budget = None if budget.lower() == "none" else int(budget)
+    elif model != AI_MODEL:
+        thinking_budget = None
+    return {"model": model, "max_output_tokens": max_output_tokens, "thinking_budget": thinking_budget}
+
+MODEL_ROUTES = {
+    "chat": _route("CHAT", 300, 0),
+    "long": _route("LONG", 1500, 0),
+    "image": _route("IMAGE", 600, 0),
+    "poll": _route("POLL", 800, 1024),
+    "channel": _route("CHANNEL", 300, 0),
+    "summary": _route("SUMMARY", 200, 0),
+}
+LONG_MESSAGE_CHARS = 280
+AI_CONCURRENCY = int(os.getenv("AI_CONCURRENCY", "32"))
+AI_TIMEOUT = float(os.getenv("AI_TIMEOUT", "30"))
+SCHEDULER_DEPTHS = {"owner": 50, "private": 200, "supporters": 100, "groups": 100, "background": 200}
+# Requests one user may have waiting in a lane
+SCHEDULER_USER_DEPTH = int(os.getenv("SCHEDULER_USER_DEPTH", "5"))
+AI_STREAMING = os.getenv("AI_STREAMING", "true").lower() == "true"
+STREAM_EDIT_INTERVAL = float(os.getenv("STREAM_EDIT_INTERVAL", "1.5"))
+PROMPT_CACHE = os.getenv("PROMPT_CACHE", "true").lower() == "true"
+PROMPT_CACHE_TTL = int(os.getenv("PROMPT_CACHE_TTL", "3600"))
+PROMPT_CACHE_MARGIN = 300
+PROMPT_CACHE_RETRY = 600
+# Images are fetched at the smallest Telegram size whose longest side reaches
+# IMAGE_TARGET_SIZE and re-encoded only when still larger than that
+IMAGE_TARGET_SIZE = int(os.getenv("IMAGE_TARGET_SIZE", "768"))
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", "300000"))
+IMAGE_QUALITY = 80
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+MEDIA_DOWNLOADS = int(os.getenv("MEDIA_DOWNLOADS", "8"))
+# GIFs, video notes and files are only downloaded in full below this size
+MEDIA_MAX_BYTES = int(os.getenv("MEDIA_MAX_BYTES", "5000000"))
+KEYFRAME_TIMEOUT = 15
+# "transcribe" turns voice notes into text first, "part" sends the audio with the reply request
+VOICE_INPUT_MODE = os.getenv("VOICE_INPUT_MODE", "transcribe").lower()
+VOICE_MAX_SECONDS = int(os.getenv("VOICE_MAX_SECONDS", "120"))
+VOICE_MAX_BYTES = 2000000
+VOICE_BITRATE = "16k"
+VOICE_TRANSCRIPT_TTL = int(os.getenv("VOICE_TRANSCRIPT_TTL", "604800"))
+VOICE_TRANSCRIPT_TOKENS = 600
+AUDIO_WORKERS = int(os.getenv("AUDIO_WORKERS", "2"))
+ALBUM_WINDOW = float(os.getenv("ALBUM_WINDOW", "1.0"))
+ALBUM_MAX_IMAGES = 10
+RECENT_MEDIA_TTL = int(os.getenv("RECENT_MEDIA_TTL", "1800"))
+RECENT_MEDIA_MAX = 5
+# Uploaded files live 48h on the provider side; stop reusing them a bit earlier
+FILE_HANDLE_TTL = 47 * 3600
+IMAGE_CACHE_TTL = int(os.getenv("IMAGE_CACHE_TTL", "604800"))
+IMAGE_CACHE_MAX = int(os.getenv("IMAGE_CACHE_MAX", "20000"))
+IMAGE_DESCRIPTION_CHARS = 1200
+IMAGE_DESCRIPTION_TOKENS = 200
+POLL_CACHE_TTL = int(os.getenv("POLL_CACHE_TTL", "604800"))
+# Binary codec for history and cache values; "none" stores them uncompressed
+CODEC_COMPRESSION = os.getenv("CODEC_COMPRESSION", "zstd").lower()
+CODEC_LEVEL = 3
+CODEC_COMPRESS_MIN = 64
+CODEC_DICT_SIZE = 16384
+# Minimum seconds between re-reads of the shared dictionaries on an unknown dictionary ID
+CODEC_DICT_RELOAD = 30
+# In-process cache in front of Valkey, per key namespace (seconds)
+NEAR_CACHE = os.getenv("NEAR_CACHE", "true").lower() == "true"
+NEAR_CACHE_TTLS = {"cache": 60, "history": 30, "stickers": 3600}
+NEAR_CACHE_MAX = int(os.getenv("NEAR_CACHE_MAX", "10000"))
+INVALIDATION_CHANNEL = "sakura:invalidate"
+# Seconds between health checks of the invalidation connections
+NEAR_CACHE_HEALTH = 15
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY", "")
 PING_LINK = os.getenv("PING_LINK", "https://t.me/DoDotPy")
 UPDATE_LINK = os.getenv("UPDATE_LINK", "https://t.me/DoDotPy")
@@ -24,7 +113,21 @@ CACHE_TTL = 300
 RATE_LIMIT_TTL = 60
 RATE_LIMIT_COUNT = 5
 MESSAGE_LIMIT = 1.0
+BURST_WINDOW = float(os.getenv("BURST_WINDOW", "1.2"))
+# Local replies for low-information messages ("ok", "hmm", emoji only)
+FAST_PATH = os.getenv("FAST_PATH", "true").lower() == "true"
+FAST_PATH_THRESHOLD = float(os.getenv("FAST_PATH_THRESHOLD", "0.8"))
+FAST_PATH_USER_CAP = int(os.getenv("FAST_PATH_USER_CAP", "3"))
+FAST_PATH_WINDOW = 3600
 BROADCAST_DELAY = 0.03
 CHAT_LENGTH = 20
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "2000"))
+HISTORY_TURN_TOKENS = int(os.getenv("HISTORY_TURN_TOKENS", "400"))
+SUMMARY_ENABLED = os.getenv("SUMMARY_ENABLED", "true").lower() == "true"
+SUMMARY_BATCH = 6
+PREGEN_PROMPTS = ["Hi"]
+PREGEN_POOL_SIZE = int(os.getenv("PREGEN_POOL_SIZE", "5"))
+PREGEN_LOW_WATER = 2
+PREGEN_TTL = 1800
 CHAT_CLEANUP = 1800
 OLD_CHAT = 3600
@@ -7,7 +7,8 @@ from pyrogram.types import Message, User
 from Sakura.Core.logging import logger
 from Sakura.Modules.messages import RESPONSES, ERROR
 from Sakura import state
-from Sakura.Core.config import SESSION_TTL
+from Sakura.Database.batch import current_batch
+from Sakura.Database.sessions import set_user_fields
 
 def fetch_user(msg: Message) -> Dict[str, any]:
     """Extract user and chat information from message"""
@@ -134,10 +135,14 @@ def get_error() -> str:
 
 async def log_response(user_id: int) -> None:
     """Update the last response time for user in Valkey"""
+    batch = current_batch()
+    if batch:
+        batch.responded.add(user_id)
+        return
+
     if state.valkey_client:
         try:
-            key = f"last_response:{user_id}"
-            await state.valkey_client.setex(key, SESSION_TTL, int(time.time()))
+            await set_user_fields(user_id, {"last_response": int(time.time())})
         except Exception as e:
             logger.error(f"❌ Failed to update response time in Valkey for user {user_id}: {e}")
     state.user_last_response_time[user_id] = time.time()
\ No newline at end of file
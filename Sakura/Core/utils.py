@@ -1,4 +1,5 @@
 # Sakura/Core/utils.py
+import asyncio
 from Sakura.Core.logging import logger
 from Sakura.Core.config import (
     BOT_TOKEN,
@@ -26,3 +27,13 @@ def validate_config() -> bool:
         logger.error("❌ API_HASH not found in environment variables")
         return False
     return True
+
+# Strong references to fire-and-forget tasks; the loop itself only keeps weak ones
+_background = set()
+
+def spawn(coro) -> asyncio.Task:
+    """Start a background task that cannot be garbage-collected while it runs."""
+    task = asyncio.create_task(coro)
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+    return task
@@ -0,0 +1,91 @@
+# Sakura/Database/batch.py
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Set
+from Sakura.Core.logging import logger
+from Sakura.Database.codec import decode_turns_fresh
+from Sakura.Database.nearcache import invalidate
+from Sakura.Database.sessions import queue_user_fields
+from Sakura import state
+
+
+class UpdateBatch:
+    """State writes collected while handling one update.
+
+    Each user holds a single history slot per update: recording a turn again
+    replaces the pending one instead of appending, so a turn can never reach
+    the history twice. Everything is written in one pipeline by flush().
+    """
+
+    def __init__(self):
+        self.turns: Dict[int, List[dict]] = {}
+        self.last_messages: Dict[int, str] = {}
+        self.responded: Set[int] = set()
+        self.closed = False
+
+    async def flush(self) -> None:
+        """Write all collected state in a single round trip (Valkey + memory fallback)."""
+        self.closed = True
+        if not (self.turns or self.last_messages or self.responded):
+            return
+
+        from Sakura.Database.conversation import APPEND_HISTORY, history_key, history_args, append_memory, fold_evicted
+
+        now = time.time()
+        for user_id in self.responded:
+            state.user_last_response_time[user_id] = now
+
+        if state.valkey_client:
+            try:
+                pipe = state.valkey_raw.pipeline()
+                users = list(self.turns)
+                for user_id in users:
+                    pipe.eval(APPEND_HISTORY, 1, history_key(user_id), *history_args(self.turns[user_id]))
+                for user_id in set(self.last_messages) | self.responded:
+                    fields = {"last_response": int(now)} if user_id in self.responded else {}
+                    if user_id in self.last_messages:
+                        fields["last_message"] = self.last_messages[user_id]
+                    queue_user_fields(pipe, user_id, fields)
+                results = await pipe.execute()
+
+                await invalidate(*(history_key(user_id) for user_id in users))
+                for user_id, evicted in zip(users, results):
+                    fold_evicted(user_id, await decode_turns_fresh(state.valkey_raw, evicted))
+                logger.debug(
+                    f"📦 Update flushed: {len(users)} turns, {len(self.last_messages)} last messages, "
+                    f"{len(self.responded)} response times"
+                )
+                return
+            except Exception as e:
+                logger.error(f"❌ Failed to flush update state to Valkey: {e}")
+
+        for user_id, messages in self.turns.items():
+            append_memory(user_id, messages)
+
+
+_current: ContextVar[Optional[UpdateBatch]] = ContextVar("update_batch", default=None)
+
+
+def current_batch() -> Optional[UpdateBatch]:
+    """The open batch of the update being handled, or None outside of one.
+
+    Tasks spawned during an update inherit the batch; once it is flushed they
+    get None and write directly.
+    """
+    batch = _current.get()
+    if batch is None or batch.closed:
+        return None
+    return batch
+
+
+@asynccontextmanager
+async def update_batch():
+    """Collect the state writes of one update and flush them when it ends."""
+    batch = UpdateBatch()
+    token = _current.set(batch)
+    try:
+        yield batch
+    finally:
+        _current.reset(token)
+        await batch.flush()
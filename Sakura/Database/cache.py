@@ -1,7 +1,16 @@
 # Sakura/Database/cache.py
+import time
 import orjson
-from Sakura.Core.config import CACHE_TTL
+from typing import Optional, List
+from Sakura.Core.config import (
+    CACHE_TTL, IMAGE_CACHE_TTL, IMAGE_CACHE_MAX, IMAGE_DESCRIPTION_CHARS, POLL_CACHE_TTL,
+    RECENT_MEDIA_TTL, RECENT_MEDIA_MAX, VOICE_TRANSCRIPT_TTL
+)
 from Sakura.Core.logging import logger
+from Sakura.Database.batch import current_batch
+from Sakura.Database.sessions import set_user_fields, get_user_fields
+from Sakura.Database.codec import encode_value, decode_fresh
+from Sakura.Database.nearcache import near_get, near_set, invalidate, MISSING
 from Sakura import state
 
 async def set_cache(key: str, value: any, ttl: int = CACHE_TTL):
@@ -10,9 +19,8 @@ async def set_cache(key: str, value: any, ttl: int = CACHE_TTL):
         return False
 
     try:
-        if isinstance(value, (dict, list)):
-            value = orjson.dumps(value)
-        await state.valkey_client.setex(f"cache:{key}", ttl, value)
+        await state.valkey_raw.setex(f"cache:{key}", ttl, encode_value(value))
+        await invalidate(f"cache:{key}")
         logger.debug(f"📦 Cache set for key: {key}")
         return True
     except Exception as e:
@@ -24,14 +32,15 @@ async def get_cache(key: str) -> any:
     if not state.valkey_client:
         return None
 
+    cached, generation = near_get(f"cache:{key}")
+    if cached is not MISSING:
+        return cached
+
     try:
-        value = await state.valkey_client.get(f"cache:{key}")
-        if value:
-            try:
-                return orjson.loads(value)
-            except:
-                return value
-        return None
+        value = await state.valkey_raw.get(f"cache:{key}")
+        value = await decode_fresh(state.valkey_raw, value) if value else None
+        near_set(f"cache:{key}", value, generation)
+        return value
     except Exception as e:
         logger.error(f"❌ Failed to get cache for key {key}: {e}")
         return None
@@ -43,6 +52,7 @@ async def delete_cache(key: str):
 
     try:
         await state.valkey_client.delete(f"cache:{key}")
+        await invalidate(f"cache:{key}")
         logger.debug(f"🗑️ Cache deleted for key: {key}")
         return True
     except Exception as e:
@@ -57,9 +67,14 @@ async def set_last_message(user_id: int, text: str) -> None:
         user_id: The user's ID.
         text: The message text to cache.
     """
+    batch = current_batch()
+    if batch:
+        batch.last_messages[user_id] = text
+        return
+
     if state.valkey_client:
         try:
-            await state.valkey_client.set(f"last_message:{user_id}", text, ex=3600)  # Cache for 1 hour
+            await set_user_fields(user_id, {"last_message": text})
             logger.info(f"👍 Cached last message for user {user_id}")
         except Exception as e:
             logger.error(f"😪 Failed to cache last message for user {user_id}: {e}")
@@ -78,7 +93,7 @@ async def get_last_message(user_id: int) -> str | None:
         return None
 
     try:
-        last_message = await state.valkey_client.get(f"last_message:{user_id}")
+        last_message = (await get_user_fields(user_id, "last_message"))["last_message"]
         if last_message:
             logger.info(f"🙌 Retrieved last message for user {user_id}")
             return last_message
@@ -86,3 +101,192 @@ async def get_last_message(user_id: int) -> str | None:
     except Exception as e:
         logger.error(f"😪 Failed to retrieve last message for user {user_id}: {e}")
         return None
+
+IMAGE_INDEX_KEY = "image_desc:index"
+
+async def get_image_description(file_unique_id: str) -> Optional[str]:
+    """
+    Retrieves the cached description of an image.
+
+    Args:
+        file_unique_id: Telegram's file_unique_id, stable across chats and forwards.
+
+    Returns:
+        The cached description, or None on a miss or error.
+    """
+    stats = state.ai_cache_stats["images"]
+    if not state.valkey_client:
+        stats["misses"] += 1
+        return None
+
+    try:
+        description = await state.valkey_client.get(f"image_desc:{file_unique_id}")
+    except Exception as e:
+        logger.error(f"❌ Failed to get image description for {file_unique_id}: {e}")
+        description = None
+
+    if description:
+        stats["hits"] += 1
+        logger.debug(f"🖼️ Image description cache hit: {file_unique_id}")
+        return description
+    stats["misses"] += 1
+    return None
+
+async def set_image_description(file_unique_id: str, description: str) -> None:
+    """
+    Caches an image description, keeping at most IMAGE_CACHE_MAX entries.
+
+    Args:
+        file_unique_id: Telegram's file_unique_id of the image.
+        description: The neutral description produced by the vision model.
+    """
+    if not state.valkey_client:
+        return
+
+    try:
+        pipe = state.valkey_client.pipeline()
+        pipe.set(f"image_desc:{file_unique_id}", description[:IMAGE_DESCRIPTION_CHARS], ex=IMAGE_CACHE_TTL)
+        pipe.zadd(IMAGE_INDEX_KEY, {file_unique_id: time.time()})
+        pipe.zcard(IMAGE_INDEX_KEY)
+        results = await pipe.execute()
+
+        # Evict the oldest descriptions once the cap is exceeded
+        overflow = results[-1] - IMAGE_CACHE_MAX
+        if overflow > 0:
+            evicted = await state.valkey_client.zrange(IMAGE_INDEX_KEY, 0, overflow - 1)
+            if evicted:
+                pipe = state.valkey_client.pipeline()
+                pipe.delete(*[f"image_desc:{uid}" for uid in evicted])
+                pipe.zrem(IMAGE_INDEX_KEY, *evicted)
+                await pipe.execute()
+                logger.debug(f"🧹 Evicted {len(evicted)} image descriptions")
+    except Exception as e:
+        logger.error(f"❌ Failed to cache image description for {file_unique_id}: {e}")
+
+async def get_poll_answer(poll_key: str) -> Optional[dict]:
+    """
+    Retrieves the cached analysis of a poll.
+
+    Args:
+        poll_key: Hash of the normalised question and options.
+
+    Returns:
+        A dict with "answer" and "reason", or None on a miss or error.
+    """
+    stats = state.ai_cache_stats["polls"]
+    answer = await get_cache(f"poll:{poll_key}")
+    # Older entries cached a whole reply, which may number the options in another order
+    if isinstance(answer, dict) and "reason" in answer:
+        stats["hits"] += 1
+        return answer
+    stats["misses"] += 1
+    return None
+
+async def set_poll_answer(poll_key: str, answer: dict) -> None:
+    """
+    Caches the analysis of a poll.
+
+    Args:
+        poll_key: Hash of the normalised question and options.
+        answer: A dict with the chosen option's text ("answer") and why ("reason").
+    """
+    await set_cache(f"poll:{poll_key}", answer, ttl=POLL_CACHE_TTL)
+
+async def remember_media(user_id: int, entry: dict) -> None:
+    """
+    Adds or updates an image in the user's recent-media index.
+
+    Args:
+        user_id: The user's ID.
+        entry: Dict with file_unique_id, file_id, width, height and an optional
+            provider upload "handle"; a "ts" timestamp is added.
+    """
+    entry = {**entry, "ts": time.time()}
+    uid = entry["file_unique_id"]
+
+    if not state.valkey_client:
+        media = state.recent_media.setdefault(user_id, {})
+        media[uid] = entry
+        for old in sorted(media, key=lambda k: media[k]["ts"])[:-RECENT_MEDIA_MAX]:
+            del media[old]
+        return
+
+    try:
+        key = f"recent_media:{user_id}"
+        pipe = state.valkey_client.pipeline()
+        pipe.hset(key, uid, orjson.dumps(entry))
+        pipe.expire(key, RECENT_MEDIA_TTL)
+        pipe.hlen(key)
+        results = await pipe.execute()
+
+        if results[-1] > RECENT_MEDIA_MAX:
+            entries = await get_recent_media(user_id)
+            stale = [e["file_unique_id"] for e in entries[RECENT_MEDIA_MAX:]]
+            if stale:
+                await state.valkey_client.hdel(key, *stale)
+    except Exception as e:
+        logger.error(f"❌ Failed to index recent media for user {user_id}: {e}")
+
+async def get_recent_media(user_id: int) -> List[dict]:
+    """
+    Retrieves the user's recent images.
+
+    Args:
+        user_id: The user's ID.
+
+    Returns:
+        Entries newest first; empty if none are left or on error.
+    """
+    if not state.valkey_client:
+        now = time.time()
+        media = state.recent_media.get(user_id, {})
+        entries = [e for e in media.values() if now - e["ts"] < RECENT_MEDIA_TTL]
+        return sorted(entries, key=lambda e: e["ts"], reverse=True)
+
+    try:
+        values = await state.valkey_client.hvals(f"recent_media:{user_id}")
+        entries = [orjson.loads(value) for value in values]
+        return sorted(entries, key=lambda e: e["ts"], reverse=True)
+    except Exception as e:
+        logger.error(f"❌ Failed to get recent media for user {user_id}: {e}")
+        return []
+
+async def get_voice_transcript(file_unique_id: str) -> Optional[str]:
+    """
+    Retrieves the cached transcript of a voice note.
+
+    Args:
+        file_unique_id: Telegram's file_unique_id of the voice note.
+
+    Returns:
+        The transcript, or None on a miss or error.
+    """
+    stats = state.ai_cache_stats["voice"]
+    transcript = None
+    if state.valkey_client:
+        try:
+            transcript = await state.valkey_client.get(f"voice_text:{file_unique_id}")
+        except Exception as e:
+            logger.error(f"❌ Failed to get voice transcript for {file_unique_id}: {e}")
+
+    if transcript:
+        stats["hits"] += 1
+        return transcript
+    stats["misses"] += 1
+    return None
+
+async def set_voice_transcript(file_unique_id: str, transcript: str) -> None:
+    """
+    Caches the transcript of a voice note.
+
+    Args:
+        file_unique_id: Telegram's file_unique_id of the voice note.
+        transcript: The transcribed text.
+    """
+    if not state.valkey_client:
+        return
+
+    try:
+        await state.valkey_client.set(f"voice_text:{file_unique_id}", transcript, ex=VOICE_TRANSCRIPT_TTL)
+    except Exception as e:
+        logger.error(f"❌ Failed to cache voice transcript for {file_unique_id}: {e}")
@@ -0,0 +1,360 @@
+# Sakura/Database/codec.py
+"""Compact binary encoding for values kept in Valkey.
+
+Every encoded value starts with a one-byte tag, so values written before the
+codec existed (orjson text, which never starts with a control byte) still
+decode transparently:
+
+    0x01  turn: role id byte + UTF-8 content
+    0x02  turn: role id byte + zstd frame of the content
+    0x03  value: orjson body
+    0x04  value: zstd frame of the orjson body
+
+zstd frames may use a shared dictionary trained on real turns; the frame
+header names the dictionary, so older dictionaries keep decoding after a new
+one is published. Benchmark, and train a dictionary on live histories, with:
+
+    python -m Sakura.Database.codec --conversations 2000 --train
+    python -m Sakura.Database.codec --valkey $VALKEY_URL --publish
+"""
+import argparse
+import asyncio
+import random
+import time
+import orjson
+from typing import Dict, List, Optional
+from Sakura.Core.config import CODEC_COMPRESSION, CODEC_LEVEL, CODEC_COMPRESS_MIN, CODEC_DICT_SIZE, CODEC_DICT_RELOAD
+from Sakura.Core.logging import logger
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+TURN = 0x01
+TURN_ZSTD = 0x02
+VALUE = 0x03
+VALUE_ZSTD = 0x04
+
+ROLES = ("user", "assistant", "model", "system")
+ROLE_IDS = {role: index for index, role in enumerate(ROLES)}
+
+DICTIONARIES_KEY = "codec:dicts"
+
+_dictionaries: Dict[int, "zstandard.ZstdCompressionDict"] = {}
+_decompressors: Dict[int, "zstandard.ZstdDecompressor"] = {}
+_current_dict: Optional[int] = None
+_compressor = None
+_last_reload = 0.0
+
+
+class CodecError(ValueError):
+    """A stored value could not be decoded."""
+
+
+class UnknownDictionaryError(CodecError):
+    """A zstd frame names a dictionary this process has not loaded."""
+
+
+def _compress_enabled() -> bool:
+    return zstandard is not None and CODEC_COMPRESSION == "zstd"
+
+
+def _get_compressor():
+    global _compressor
+    if _compressor is None:
+        _compressor = zstandard.ZstdCompressor(level=CODEC_LEVEL, dict_data=_dictionaries.get(_current_dict))
+    return _compressor
+
+
+def _get_decompressor(dict_id: int):
+    if dict_id not in _decompressors:
+        if dict_id and dict_id not in _dictionaries:
+            raise UnknownDictionaryError(f"unknown zstd dictionary {dict_id}")
+        _decompressors[dict_id] = zstandard.ZstdDecompressor(dict_data=_dictionaries.get(dict_id))
+    return _decompressors[dict_id]
+
+
+def _frame(tag: int, prefix: bytes, body: bytes, compress: bool) -> bytes:
+    # Compress only where it pays: short bodies grow from the frame header
+    if compress and len(body) >= CODEC_COMPRESS_MIN and _compress_enabled():
+        packed = _get_compressor().compress(body)
+        if len(packed) < len(body):
+            return bytes((tag + 1,)) + prefix + packed
+    return bytes((tag,)) + prefix + body
+
+
+def _unpack(body: bytes) -> bytes:
+    if zstandard is None:
+        raise CodecError("zstd value found but zstandard is not installed")
+    params = zstandard.get_frame_parameters(body)
+    return _get_decompressor(params.dict_id).decompress(body)
+
+
+def encode_turn(message: dict, compress: bool = True) -> bytes:
+    """Encode a {"role", "content"} history turn; other shapes fall back to encode_value."""
+    role = ROLE_IDS.get(message.get("role"))
+    content = message.get("content")
+    if role is None or not isinstance(content, str) or len(message) != 2:
+        return encode_value(message, compress)
+    return _frame(TURN, bytes((role,)), content.encode(), compress)
+
+
+def encode_value(value, compress: bool = True) -> bytes:
+    """Encode any orjson-serialisable value."""
+    return _frame(VALUE, b"", orjson.dumps(value), compress)
+
+
+def decode(data):
+    """Decode a stored value, whether codec-framed or legacy orjson text.
+
+    Legacy values that are not JSON at all come back as plain strings.
+
+    Raises:
+        CodecError: If a framed value is corrupt or needs an unknown dictionary
+    """
+    if isinstance(data, str):
+        data = data.encode()
+    if not data:
+        raise CodecError("empty value")
+
+    tag = data[0]
+    try:
+        if tag in (TURN, TURN_ZSTD):
+            content = data[2:] if tag == TURN else _unpack(data[2:])
+            return {"role": ROLES[data[1]], "content": content.decode()}
+        if tag == VALUE:
+            return orjson.loads(data[1:])
+        if tag == VALUE_ZSTD:
+            return orjson.loads(_unpack(data[1:]))
+    except CodecError:
+        raise
+    except Exception as e:
+        raise CodecError(f"corrupt value with tag {tag}: {e}") from e
+
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return data.decode(errors="replace")
+
+
+def decode_turns(items: list) -> List[dict]:
+    """Decode history items, dropping (and logging) any that cannot be read."""
+    turns = []
+    for item in items:
+        try:
+            turns.append(decode(item))
+        except CodecError as e:
+            logger.warning(f"⚠️ Skipping unreadable history item: {e}")
+    return turns
+
+
+async def decode_fresh(client, data):
+    """Decode a stored value, re-reading the shared dictionaries if it names one not loaded yet."""
+    try:
+        return decode(data)
+    except UnknownDictionaryError:
+        if not await reload_dictionaries(client):
+            raise
+    return decode(data)
+
+
+async def decode_turns_fresh(client, items: list) -> List[dict]:
+    """decode_turns, re-reading the shared dictionaries first if an item names one not loaded yet."""
+    try:
+        return [decode(item) for item in items]
+    except UnknownDictionaryError:
+        await reload_dictionaries(client)
+    except CodecError:
+        pass
+    return decode_turns(items)
+
+
+def use_dictionary(dict_data: bytes) -> int:
+    """Register a trained dictionary for decoding and make it the one used to encode.
+
+    Returns:
+        int: The dictionary ID written into zstd frame headers
+    """
+    global _compressor, _current_dict
+    dictionary = zstandard.ZstdCompressionDict(dict_data)
+    dict_id = dictionary.dict_id()
+    _dictionaries[dict_id] = dictionary
+    _decompressors.pop(dict_id, None)
+    _current_dict = dict_id
+    _compressor = None
+    return dict_id
+
+
+def train_dictionary(samples: List[bytes], size: int = CODEC_DICT_SIZE) -> Optional[bytes]:
+    """Train a zstd dictionary on encoded turn contents.
+
+    Returns:
+        bytes: The dictionary, or None if zstandard is missing or training failed
+    """
+    if zstandard is None:
+        return None
+    try:
+        return zstandard.train_dictionary(size, samples).as_bytes()
+    except zstandard.ZstdError as e:
+        logger.error(f"❌ zstd dictionary training failed: {e}")
+        return None
+
+
+async def load_dictionaries(client) -> int:
+    """Load the shared dictionaries from Valkey; the newest one is used to encode.
+
+    Dictionaries are loaded whenever zstandard is installed, so values written
+    compressed by other instances stay readable with compression turned off here.
+
+    Args:
+        client: A Valkey client created with decode_responses=False
+
+    Returns:
+        int: Number of dictionaries loaded
+    """
+    if zstandard is None:
+        return 0
+    try:
+        stored = await client.hgetall(DICTIONARIES_KEY)
+    except Exception as e:
+        logger.error(f"❌ Failed to load codec dictionaries: {e}")
+        return 0
+
+    # Dictionaries are stored under increasing sequence numbers; load the newest last
+    for _, dict_data in sorted(stored.items(), key=lambda item: int(item[0])):
+        use_dictionary(dict_data)
+    if stored:
+        logger.info(f"🗜️ Loaded {len(stored)} codec dictionaries")
+    return len(stored)
+
+
+async def reload_dictionaries(client) -> bool:
+    """Re-read the shared dictionaries after a value named one that is not loaded.
+
+    Another instance may have published it since startup. Reloads are spaced
+    CODEC_DICT_RELOAD seconds apart, so a dictionary that is really missing
+    does not cost a round trip on every read.
+
+    Returns:
+        bool: True if the dictionaries were re-read
+    """
+    global _last_reload
+    now = time.monotonic()
+    if zstandard is None or now - _last_reload < CODEC_DICT_RELOAD:
+        return False
+    _last_reload = now
+    logger.info("🗜️ Unknown codec dictionary, reloading shared dictionaries")
+    await load_dictionaries(client)
+    return True
+
+
+async def publish_dictionary(client, dict_data: bytes) -> int:
+    """Store a newly trained dictionary so every instance encodes with it after restart.
+
+    Dictionaries are never removed, as values compressed with them may still be live.
+    """
+    sequence = await client.hlen(DICTIONARIES_KEY)
+    await client.hset(DICTIONARIES_KEY, str(sequence), dict_data)
+    return use_dictionary(dict_data)
+
+
+# Benchmark ---------------------------------------------------------------------------
+
+PHRASES = (
+    "haan yaar", "kya kar rahe ho", "aaj bahut thak gayi", "sach mein?", "mujhe nahi pata",
+    "that sounds fun", "tell me more about it", "good night", "khana khaya?", "ok",
+    "main theek hoon, tum batao", "exam kal hai", "hehe", "you are so sweet", "kuch nahi bas",
+    "movie dekhi kal", "kaunsi?", "I missed you", "itna late kyun soye", "chai peeni hai",
+)
+
+
+def sample_conversations(count: int, turns: int) -> List[List[dict]]:
+    """Synthetic Hinglish chats shaped like stored histories."""
+    rng = random.Random(7)
+    conversations = []
+    for _ in range(count):
+        history = []
+        for index in range(turns):
+            length = rng.randint(1, 3) if index % 2 == 0 else rng.randint(2, 6)
+            content = " ".join(rng.choice(PHRASES) for _ in range(length))
+            history.append({"role": "user" if index % 2 == 0 else "assistant", "content": content})
+        conversations.append(history)
+    return conversations
+
+
+def _measure(name: str, conversations: List[List[dict]], encode, decode_one) -> None:
+    turns = sum(len(history) for history in conversations)
+    start = time.perf_counter()
+    encoded = [[encode(message) for message in history] for history in conversations]
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for history in encoded:
+        for item in history:
+            decode_one(item)
+    decode_time = time.perf_counter() - start
+    size = sum(len(item) for history in encoded for item in history) / len(conversations)
+    print(f"{name:<22} {size:>10.0f} {encode_time / turns * 1e6:>10.2f} {decode_time / turns * 1e6:>10.2f}")
+
+
+async def fetch_conversations(client, count: int) -> List[List[dict]]:
+    """Sample stored histories so the benchmark and dictionary reflect real chats."""
+    await load_dictionaries(client)
+    conversations = []
+    async for key in client.scan_iter(match="history:*", count=500):
+        history = decode_turns(await client.lrange(key, 0, -1))
+        if history:
+            conversations.append(history)
+        if len(conversations) >= count:
+            break
+    return conversations
+
+
+async def run(args) -> None:
+    client = None
+    if args.valkey:
+        from valkey.asyncio import Valkey
+        client = Valkey.from_url(args.valkey, decode_responses=False)
+        conversations = await fetch_conversations(client, args.conversations)
+    else:
+        conversations = sample_conversations(args.conversations, args.turns)
+    if len(conversations) < 2:
+        print("Not enough conversations to benchmark")
+        return
+
+    print(f"{'encoding':<22} {'bytes/conv':>10} {'enc µs':>10} {'dec µs':>10}")
+    _measure("orjson", conversations, orjson.dumps, orjson.loads)
+    _measure("codec", conversations, lambda message: encode_turn(message, compress=False), decode)
+
+    if not _compress_enabled():
+        print("zstd compression is unavailable or disabled; skipping compressed encodings")
+        return
+
+    _measure("codec+zstd", conversations, encode_turn, decode)
+    if args.train or args.publish:
+        # Train on one half, measure on the other so the numbers are not flattered
+        half = len(conversations) // 2
+        samples = [m["content"].encode() for history in conversations[:half] for m in history]
+        dict_data = train_dictionary(samples)
+        if not dict_data:
+            return
+        use_dictionary(dict_data)
+        _measure("codec+zstd+dict", conversations[half:], encode_turn, decode)
+
+        if args.publish and client:
+            dict_id = await publish_dictionary(client, dict_data)
+            print(f"Published dictionary {dict_id}; restart the bot to encode with it")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Valkey value codec")
+    parser.add_argument("--conversations", type=int, default=1000)
+    parser.add_argument("--turns", type=int, default=20, help="Turns per synthetic conversation (CHAT_LENGTH)")
+    parser.add_argument("--valkey", help="Valkey URL to sample real histories from instead of synthetic ones")
+    parser.add_argument("--train", action="store_true", help="Also train and measure a zstd dictionary")
+    parser.add_argument("--publish", action="store_true", help="Store the trained dictionary in --valkey")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
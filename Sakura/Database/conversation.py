@@ -1,39 +1,125 @@
 # Sakura/Database/conversation.py
 import orjson
-from Sakura.Core.config import CHAT_LENGTH, SESSION_TTL
+from Sakura.Core.config import CHAT_LENGTH, SESSION_TTL, HISTORY_TOKEN_BUDGET, HISTORY_TURN_TOKENS, SUMMARY_ENABLED, SUMMARY_BATCH
 from Sakura.Core.logging import logger
+from Sakura.Core.utils import spawn
+from Sakura.Database.batch import current_batch
+from Sakura.Database.codec import encode_turn, decode_turns_fresh
+from Sakura.Database.nearcache import near_get, near_set, invalidate, MISSING
 from Sakura import state
 
-async def add_history(user_id: int, message: str, is_user: bool = True):
-    """Add message to user's conversation history (Valkey + memory fallback)"""
-    role = "user" if is_user else "assistant"
-    new_message = {"role": role, "content": message}
+def trim_history(history: list) -> tuple:
+    """Split history into the kept window and the turns evicted from it.
+
+    With summaries enabled, overflow evicts a whole SUMMARY_BATCH at once so
+    the summariser runs once per batch rather than once per message.
+    """
+    if len(history) <= CHAT_LENGTH:
+        return history, []
+    cut = len(history) - CHAT_LENGTH
+    if SUMMARY_ENABLED:
+        cut = max(cut, min(SUMMARY_BATCH, len(history)))
+    return history[cut:], history[:cut]
+
+# Appends turns, refreshes the TTL and trims in one atomic step; returns the evicted turns
+APPEND_HISTORY = """
+local length = redis.call('RPUSH', KEYS[1], unpack(ARGV, 4))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+local limit = tonumber(ARGV[2])
+if length <= limit then
+    return {}
+end
+local cut = length - limit
+local batch = tonumber(ARGV[3])
+if batch > 0 then
+    cut = math.max(cut, math.min(batch, length))
+end
+local evicted = redis.call('LRANGE', KEYS[1], 0, cut - 1)
+redis.call('LTRIM', KEYS[1], cut, -1)
+return evicted
+"""
+# Legacy turns go in front of whatever the list already holds, so turns written
+# since the rollout are kept; the newest ARGV[2] survive.
+# KEYS: legacy string, history list. ARGV: TTL, window, then the turns newest first
+MERGE_LEGACY_HISTORY = """
+redis.call('LPUSH', KEYS[2], unpack(ARGV, 3))
+redis.call('LTRIM', KEYS[2], -tonumber(ARGV[2]), -1)
+if redis.call('TTL', KEYS[2]) < 0 then
+    redis.call('EXPIRE', KEYS[2], ARGV[1])
+end
+redis.call('DEL', KEYS[1])
+"""
+HISTORY_MIGRATED_KEY = "sakura:history_migrated"
 
+_append_script = None
+
+def history_key(user_id: int) -> str:
+    return f"history:{user_id}"
+
+def history_args(messages: list) -> list:
+    """ARGV for APPEND_HISTORY: TTL, window, eviction batch, then the encoded turns."""
+    return [SESSION_TTL, CHAT_LENGTH, SUMMARY_BATCH if SUMMARY_ENABLED else 0] + [encode_turn(msg) for msg in messages]
+
+def fold_evicted(user_id: int, evicted: list) -> None:
+    """Hand evicted turns to the background summariser (off the hot path)."""
+    if not evicted or not SUMMARY_ENABLED:
+        return
+    from Sakura.Chat.summary import summarize_history
+    spawn(summarize_history(user_id, evicted))
+
+async def append_history(user_id: int, messages: list):
+    """Append turns to the user's history list in a single round trip (Valkey + memory fallback)"""
+    global _append_script
     if state.valkey_client:
         try:
-            key = f"conversation:{user_id}"
-            existing = await state.valkey_client.get(key)
-            history = orjson.loads(existing) if existing else []
-            history.append(new_message)
-            if len(history) > CHAT_LENGTH:
-                history = history[-CHAT_LENGTH:]
-            await state.valkey_client.setex(key, SESSION_TTL, orjson.dumps(history))
+            if _append_script is None:
+                _append_script = state.valkey_raw.register_script(APPEND_HISTORY)
+            evicted = await _append_script(keys=[history_key(user_id)], args=history_args(messages))
+            await invalidate(history_key(user_id))
             logger.debug(f"💬 Conversation updated in Valkey for user {user_id}")
+            fold_evicted(user_id, await decode_turns_fresh(state.valkey_raw, evicted))
             return
         except Exception as e:
             logger.error(f"❌ Failed to update conversation in Valkey for user {user_id}: {e}")
 
+    append_memory(user_id, messages)
+
+
+def append_memory(user_id: int, messages: list) -> None:
+    """Append turns to the in-memory history used when Valkey is unavailable."""
     if user_id not in state.conversation_history:
         state.conversation_history[user_id] = []
-    state.conversation_history[user_id].append(new_message)
-    if len(state.conversation_history[user_id]) > CHAT_LENGTH:
-        state.conversation_history[user_id] = state.conversation_history[user_id][-CHAT_LENGTH:]
+    state.conversation_history[user_id].extend(messages)
+    state.conversation_history[user_id], evicted = trim_history(state.conversation_history[user_id])
+    fold_evicted(user_id, evicted)
+
+
+async def add_history(user_id: int, message: str, is_user: bool = True):
+    """Add message to user's conversation history (Valkey + memory fallback)"""
+    role = "user" if is_user else "assistant"
+    new_message = {"role": role, "content": message}
+    batch = current_batch()
+    if batch:
+        batch.turns.setdefault(user_id, []).append(new_message)
+        return
+    await append_history(user_id, [new_message])
 
 
 async def update_history(user_id: int, user_message: str, ai_response: str):
-    """Add both user message and AI response to history."""
-    await add_history(user_id, user_message, is_user=True)
-    await add_history(user_id, ai_response, is_user=False)
+    """Add both user message and AI response to history.
+
+    During an update the turn goes to its batch, replacing any turn already
+    recorded for the user, and is written when the update ends.
+    """
+    turn = [
+        {"role": "user", "content": user_message},
+        {"role": "assistant", "content": ai_response},
+    ]
+    batch = current_batch()
+    if batch:
+        batch.turns[user_id] = turn
+        return
+    await append_history(user_id, turn)
     logger.debug(f"📜 Updated conversation history for user {user_id}")
 
 
@@ -41,11 +127,23 @@ async def get_history(user_id: int) -> list:
     """Get conversation history as a list of dicts."""
     history = []
     if state.valkey_client:
+        cached, generation = near_get(history_key(user_id))
+        if cached is not MISSING:
+            return cached
         try:
-            key = f"conversation:{user_id}"
-            existing = await state.valkey_client.get(key)
-            if existing:
-                history = orjson.loads(existing)
+            if state.history_migrated:
+                items = await state.valkey_raw.lrange(history_key(user_id), 0, -1)
+                history = await decode_turns_fresh(state.valkey_raw, items)
+            else:
+                # Not migrated yet: older turns may still sit in a legacy JSON string
+                pipe = state.valkey_raw.pipeline()
+                pipe.lrange(history_key(user_id), 0, -1)
+                pipe.get(f"conversation:{user_id}")
+                items, legacy = await pipe.execute()
+                history = await decode_turns_fresh(state.valkey_raw, items)
+                if legacy:
+                    history = (orjson.loads(legacy) + history)[-CHAT_LENGTH:]
+            near_set(history_key(user_id), history, generation)
         except Exception as e:
             logger.error(f"❌ Failed to get conversation from Valkey for user {user_id}: {e}")
 
@@ -54,6 +152,28 @@ async def get_history(user_id: int) -> list:
 
     return history
 
+async def get_summary(user_id: int) -> str | None:
+    """Get the running summary of turns evicted from the user's history."""
+    if state.valkey_client:
+        try:
+            summary = await state.valkey_client.get(f"summary:{user_id}")
+            if summary:
+                return summary
+        except Exception as e:
+            logger.error(f"❌ Failed to get summary from Valkey for user {user_id}: {e}")
+    return state.conversation_summaries.get(user_id)
+
+async def set_summary(user_id: int, summary: str):
+    """Store the running conversation summary next to the history."""
+    if state.valkey_client:
+        try:
+            await state.valkey_client.setex(f"summary:{user_id}", SESSION_TTL, summary)
+            logger.debug(f"📝 Summary updated in Valkey for user {user_id}")
+            return
+        except Exception as e:
+            logger.error(f"❌ Failed to update summary in Valkey for user {user_id}: {e}")
+    state.conversation_summaries[user_id] = summary
+
 async def get_context(user_id: int) -> str:
     """Get formatted conversation context for the user."""
     history = await get_history(user_id)
@@ -61,3 +181,82 @@ async def get_context(user_id: int) -> str:
         return ""
     context_lines = [f"User: {msg['content']}" if msg["role"] == "user" else f"Sakura: {msg['content']}" for msg in history]
     return "\n".join(context_lines)
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate (~4 chars per ASCII token, denser for non-Latin scripts)."""
+    if not text:
+        return 0
+    extra_bytes = len(text.encode("utf-8")) - len(text)
+    return len(text) // 4 + extra_bytes // 3 + 1
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cut text down to roughly max_tokens, keeping the beginning."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # Shrink proportionally, then trim until the estimate fits
+    cut = max(1, len(text) * max_tokens // estimate_tokens(text))
+    while cut > 1 and estimate_tokens(text[:cut]) > max_tokens:
+        cut = cut * 9 // 10
+    return text[:cut].rstrip() + "…"
+
+async def build_history(user_id: int, budget: int = HISTORY_TOKEN_BUDGET) -> tuple:
+    """Pack the newest history turns into a token budget.
+
+    Oversized turns are truncated to HISTORY_TURN_TOKENS first; turns are
+    then taken newest-first until the budget is spent.
+
+    Returns:
+        tuple: (history list oldest-first, estimated token count)
+    """
+    history = await get_history(user_id)
+    packed = []
+    used = 0
+    for msg in reversed(history):
+        content = truncate_tokens(str(msg["content"]), HISTORY_TURN_TOKENS)
+        tokens = estimate_tokens(content)
+        if used + tokens > budget:
+            break
+        packed.append({"role": msg["role"], "content": content})
+        used += tokens
+    packed.reverse()
+
+    # Gemini expects history to start with a user turn
+    while packed and packed[0]["role"] != "user":
+        used -= estimate_tokens(packed.pop(0)["content"])
+
+    return packed, used
+
+async def migrate_history() -> None:
+    """One-time conversion of legacy conversation:{id} JSON strings into history:{id} lists.
+
+    Legacy turns are merged in front of any turns already written to the list.
+    """
+    if not state.valkey_client:
+        return
+    try:
+        if await state.valkey_client.get(HISTORY_MIGRATED_KEY):
+            state.history_migrated = True
+            return
+
+        migrated = 0
+        async for key in state.valkey_client.scan_iter(match="conversation:*", count=500):
+            user_id = key.split(":", 1)[1]
+            legacy = await state.valkey_client.get(key)
+            ttl = await state.valkey_client.ttl(key)
+            history = orjson.loads(legacy) if legacy else []
+            if history:
+                turns = [encode_turn(msg) for msg in reversed(history[-CHAT_LENGTH:])]
+                await state.valkey_raw.eval(
+                    MERGE_LEGACY_HISTORY, 2, key, history_key(user_id),
+                    ttl if ttl > 0 else SESSION_TTL, CHAT_LENGTH, *turns
+                )
+            else:
+                await state.valkey_client.delete(key)
+            await invalidate(history_key(user_id))
+            migrated += 1
+
+        await state.valkey_client.set(HISTORY_MIGRATED_KEY, 1)
+        state.history_migrated = True
+        logger.info(f"✅ Migrated {migrated} conversations to list storage")
+    except Exception as e:
+        logger.error(f"❌ History migration failed, legacy reads stay enabled: {e}")
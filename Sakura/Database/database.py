@@ -90,7 +90,9 @@ async def load_data():
             state.user_ids.update(row['user_id'] for row in user_rows)
             group_rows = await conn.fetch("SELECT group_id FROM groups")
             state.group_ids.update(row['group_id'] for row in group_rows)
-        logger.info(f"✅ Loaded {len(state.user_ids)} users and {len(state.group_ids)} groups from database")
+            supporter_rows = await conn.fetch("SELECT DISTINCT user_id FROM purchases")
+            state.supporter_ids.update(row['user_id'] for row in supporter_rows)
+        logger.info(f"✅ Loaded {len(state.user_ids)} users, {len(state.group_ids)} groups and {len(state.supporter_ids)} supporters from database")
     except Exception as e:
         logger.error(f"❌ Failed to load data from database: {e}")
 
@@ -166,6 +168,7 @@ async def get_groups():
 
 async def save_purchase(user_id: int, username: str = None, first_name: str = None, last_name: str = None, amount: int = 0, charge_id: str = None):
     """Saves a purchase to the database asynchronously."""
+    state.supporter_ids.add(user_id)
     if not state.db_pool:
         logger.warning("⚠️ Database pool not available, cannot save purchase.")
         return
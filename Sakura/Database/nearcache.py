@@ -0,0 +1,194 @@
+# Sakura/Database/nearcache.py
+import asyncio
+import itertools
+import os
+import time
+from valkey.asyncio import Valkey as AsyncValkey
+from Sakura.Core.config import VALKEY_URL, NEAR_CACHE, NEAR_CACHE_TTLS, NEAR_CACHE_MAX, NEAR_CACHE_HEALTH, INVALIDATION_CHANNEL
+from Sakura.Core.logging import logger
+from Sakura import state
+
+# Value near_get returns on a miss, since None is a valid cached value
+MISSING = object()
+
+TRACKING_CHANNEL = "__redis__:invalidate"
+
+# Generation of each key with a read in flight. A miss captures it, an
+# invalidation drops it, and a value is stored only while it is unchanged, so a
+# read that raced a write is never cached. Numbers are never reused.
+_generations = {}
+_counter = itertools.count()
+
+
+def _namespace(key: str) -> str:
+    return key.split(":", 1)[0]
+
+
+def _stats(namespace: str) -> dict:
+    return state.near_cache_stats.setdefault(namespace, {"hits": 0, "misses": 0, "invalidations": 0})
+
+
+def near_get(key: str) -> tuple:
+    """Look a key up in the in-process cache.
+
+    Only namespaces listed in NEAR_CACHE_TTLS are cached, and only while an
+    invalidation listener is running, so other instances' writes are never
+    missed.
+
+    Returns:
+        tuple: (cached value or MISSING, generation to pass to near_set on a miss)
+    """
+    namespace = _namespace(key)
+    if not state.near_cache_mode or namespace not in NEAR_CACHE_TTLS:
+        return MISSING, None
+
+    entry = state.near_cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        _stats(namespace)["hits"] += 1
+        return entry[1], None
+
+    state.near_cache.pop(key, None)
+    _stats(namespace)["misses"] += 1
+    if key not in _generations:
+        _generations[key] = next(_counter)
+    return MISSING, _generations[key]
+
+
+def near_set(key: str, value, generation) -> None:
+    """Remember a value just read from Valkey, unless the key was invalidated since the miss."""
+    if generation is None or _generations.get(key) != generation:
+        return
+    del _generations[key]
+
+    if len(state.near_cache) >= NEAR_CACHE_MAX:
+        # Dicts keep insertion order, so this drops the oldest entry
+        state.near_cache.pop(next(iter(state.near_cache)))
+    state.near_cache[key] = (time.monotonic() + NEAR_CACHE_TTLS[_namespace(key)], value)
+
+
+def _drop(key: str) -> None:
+    _generations.pop(key, None)
+    if state.near_cache.pop(key, None) is not None:
+        _stats(_namespace(key))["invalidations"] += 1
+
+
+async def invalidate(*keys: str) -> None:
+    """Drop keys this instance just wrote, and tell other instances when tracking is unavailable."""
+    for key in keys:
+        _drop(key)
+    if state.near_cache_mode == "pubsub" and state.valkey_client:
+        try:
+            pipe = state.valkey_client.pipeline()
+            for key in keys:
+                if _namespace(key) in NEAR_CACHE_TTLS:
+                    pipe.publish(INVALIDATION_CHANNEL, key)
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"❌ Failed to publish near-cache invalidation: {e}")
+
+
+def _clear() -> None:
+    state.near_cache.clear()
+    _generations.clear()
+
+
+async def _subscribe():
+    """Subscribe to invalidations, preferring server-side CLIENT TRACKING.
+
+    Tracking runs in broadcast mode on a dedicated connection that redirects
+    invalidations to our subscriber, so every write to a cached prefix is
+    reported whoever made it. Servers that refuse CLIENT commands fall back
+    to a channel the bot publishes its own writes to.
+
+    Returns:
+        tuple: (mode, listener client, pubsub, tracking client or None)
+    """
+    name = f"sakura-near-{os.getpid()}-{id(state)}"
+    listener = AsyncValkey.from_url(VALKEY_URL, decode_responses=True, client_name=name)
+    pubsub = listener.pubsub()
+    tracker = None
+    try:
+        await pubsub.subscribe(TRACKING_CHANNEL)
+        clients = await listener.client_list(_type="pubsub")
+        redirect = next(c["id"] for c in clients if c.get("name") == name)
+
+        tracker = AsyncValkey.from_url(VALKEY_URL, decode_responses=True, single_connection_client=True)
+        prefixes = [f"{namespace}:" for namespace in NEAR_CACHE_TTLS]
+        await tracker.client_tracking_on(clientid=int(redirect), bcast=True, prefix=prefixes)
+        return "tracking", listener, pubsub, tracker
+    except Exception as e:
+        logger.warning(f"⚠️ CLIENT TRACKING unavailable, using pub/sub invalidation: {e}")
+        if tracker:
+            await tracker.aclose()
+        await pubsub.unsubscribe(TRACKING_CHANNEL)
+        await pubsub.subscribe(INVALIDATION_CHANNEL)
+        return "pubsub", listener, pubsub, None
+
+
+async def _check_health(pubsub, tracker) -> None:
+    """Raise if invalidations may no longer arrive, so the listener is rebuilt.
+
+    A dead connection fails the command. In tracking mode a tracker that
+    reconnected has tracking off, and a subscriber that reconnected leaves the
+    redirect broken; TRACKINGINFO shows both.
+    """
+    await pubsub.ping()
+    if tracker:
+        reply = await tracker.client_trackinginfo()
+        flags = dict(zip(reply[::2], reply[1::2]))["flags"]
+        if "on" not in flags or "broken_redirect" in flags:
+            raise ConnectionError(f"tracking lost (flags: {' '.join(flags)})")
+
+
+async def run_invalidation() -> None:
+    """Keep the invalidation listener running; the near cache is off while it is down."""
+    if not NEAR_CACHE:
+        return
+
+    while True:
+        listener = pubsub = tracker = None
+        try:
+            mode, listener, pubsub, tracker = await _subscribe()
+            _clear()
+            state.near_cache_mode = mode
+            logger.info(f"🧊 Near cache enabled ({mode} invalidation)")
+
+            checked = time.monotonic()
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=NEAR_CACHE_HEALTH)
+                if time.monotonic() - checked >= NEAR_CACHE_HEALTH:
+                    await _check_health(pubsub, tracker)
+                    checked = time.monotonic()
+                if message is None or message["type"] != "message":
+                    continue
+                keys = message["data"]
+                if keys is None:
+                    # FLUSHALL / FLUSHDB
+                    _clear()
+                    continue
+                for key in keys if isinstance(keys, list) else [keys]:
+                    _drop(key)
+
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error(f"❌ Near-cache invalidation listener failed: {e}")
+        finally:
+            state.near_cache_mode = None
+            _clear()
+            for client in (pubsub, tracker, listener):
+                if client:
+                    try:
+                        await client.aclose()
+                    except Exception:
+                        pass
+
+        await asyncio.sleep(5)
+
+
+def near_cache_summary() -> dict:
+    """Hit/miss counts per namespace for /stats."""
+    return {
+        namespace: dict(_stats(namespace), entries=sum(1 for key in state.near_cache if _namespace(key) == namespace))
+        for namespace in NEAR_CACHE_TTLS
+    }
@@ -1,21 +1,57 @@
 # Sakura/Database/sessions.py
 import orjson
+from typing import Dict, Optional
 from Sakura.Core.config import SESSION_TTL
 from Sakura.Core.logging import logger
 from Sakura import state
 
+# Per-user scalars live as fields of one user:{id} hash sharing a single expiry.
+# Fields that used to be separate keys, with the key they were stored under:
+LEGACY_KEYS = {
+    "last_message": "last_message:{}",
+    "last_response": "last_response:{}",
+    "session": "session:{}",
+}
+USERS_MIGRATED_KEY = "sakura:users_migrated"
+
+def user_key(user_id) -> str:
+    return f"user:{user_id}"
+
+def queue_user_fields(pipe, user_id: int, fields: Dict[str, any]) -> None:
+    """Add a write of user hash fields, and the shared expiry refresh, to a pipeline."""
+    pipe.hset(user_key(user_id), mapping=fields)
+    pipe.expire(user_key(user_id), SESSION_TTL)
+
+async def set_user_fields(user_id: int, fields: Dict[str, any]) -> None:
+    """Write user hash fields in one round trip."""
+    pipe = state.valkey_client.pipeline()
+    queue_user_fields(pipe, user_id, fields)
+    await pipe.execute()
+
+async def get_user_fields(user_id: int, *fields: str) -> Dict[str, Optional[str]]:
+    """Read user hash fields with a single HMGET.
+
+    Until the background migration has finished, fields missing from the hash
+    are looked up under their legacy keys.
+
+    Returns:
+        dict: Field name to value, None where unset
+    """
+    values = dict(zip(fields, await state.valkey_client.hmget(user_key(user_id), fields)))
+
+    missing = [field for field in fields if values[field] is None and field in LEGACY_KEYS]
+    if missing and not state.users_migrated:
+        legacy = await state.valkey_client.mget([LEGACY_KEYS[field].format(user_id) for field in missing])
+        values.update({field: value for field, value in zip(missing, legacy) if value is not None})
+    return values
+
 async def save_session(user_id: int, session_data: dict):
     """Save user session data to Valkey"""
     if not state.valkey_client:
         return False
 
     try:
-        key = f"session:{user_id}"
-        await state.valkey_client.setex(
-            key,
-            SESSION_TTL,
-            orjson.dumps(session_data)
-        )
+        await set_user_fields(user_id, {"session": orjson.dumps(session_data)})
         logger.debug(f"💾 Session saved for user {user_id}")
         return True
     except Exception as e:
@@ -28,8 +64,7 @@ async def get_session(user_id: int) -> dict:
         return {}
 
     try:
-        key = f"session:{user_id}"
-        data = await state.valkey_client.get(key)
+        data = (await get_user_fields(user_id, "session"))["session"]
         if data:
             return orjson.loads(data)
         return {}
@@ -43,10 +78,44 @@ async def delete_session(user_id: int):
         return False
 
     try:
-        key = f"session:{user_id}"
-        await state.valkey_client.delete(key)
+        pipe = state.valkey_client.pipeline()
+        pipe.hdel(user_key(user_id), "session")
+        pipe.delete(LEGACY_KEYS["session"].format(user_id))
+        await pipe.execute()
         logger.debug(f"🗑️ Session deleted for user {user_id}")
         return True
     except Exception as e:
         logger.error(f"❌ Failed to delete session for user {user_id}: {e}")
         return False
+
+async def migrate_user_keys() -> None:
+    """One-time move of last_message:, last_response: and session: keys into user:{id} hashes.
+
+    Values already present in a hash are newer and are kept. Legacy rate-limit
+    keys are not moved; they expire within a minute on their own.
+    """
+    if not state.valkey_client:
+        return
+    try:
+        if await state.valkey_client.get(USERS_MIGRATED_KEY):
+            state.users_migrated = True
+            return
+
+        migrated = 0
+        for field, pattern in LEGACY_KEYS.items():
+            async for key in state.valkey_client.scan_iter(match=pattern.format("*"), count=500):
+                user_id = key.split(":", 1)[1]
+                value = await state.valkey_client.get(key)
+                pipe = state.valkey_client.pipeline()
+                if value is not None:
+                    pipe.hsetnx(user_key(user_id), field, value)
+                    pipe.expire(user_key(user_id), SESSION_TTL)
+                pipe.delete(key)
+                await pipe.execute()
+                migrated += 1
+
+        await state.valkey_client.set(USERS_MIGRATED_KEY, 1)
+        state.users_migrated = True
+        logger.info(f"✅ Migrated {migrated} per-user keys into user hashes")
+    except Exception as e:
+        logger.error(f"❌ User key migration failed, legacy reads stay enabled: {e}")
@@ -2,6 +2,7 @@
 from valkey.asyncio import Valkey as AsyncValkey
 from Sakura.Core.config import VALKEY_URL
 from Sakura.Core.logging import logger
+from Sakura.Database.codec import load_dictionaries
 from Sakura import state
 
 async def connect_cache():
@@ -15,12 +16,23 @@ async def connect_cache():
             retry_on_timeout=True,
             health_check_interval=30
         )
+        # Codec-encoded values (history, cache, stickers) are binary and need undecoded replies
+        state.valkey_raw = AsyncValkey.from_url(
+            VALKEY_URL,
+            decode_responses=False,
+            socket_connect_timeout=5,
+            socket_timeout=5,
+            retry_on_timeout=True,
+            health_check_interval=30
+        )
         await state.valkey_client.ping()
+        await load_dictionaries(state.valkey_raw)
         logger.info("✅ Valkey client initialized and connected successfully")
         return True
     except Exception as e:
         logger.error(f"❌ Failed to initialize Valkey client: {e}")
         state.valkey_client = None
+        state.valkey_raw = None
         return False
 
 async def close_cache():
@@ -28,6 +40,7 @@ async def close_cache():
     if state.valkey_client:
         try:
             await state.valkey_client.aclose()
+            await state.valkey_raw.aclose()
             logger.info("✅ Valkey connection closed")
         except Exception as e:
             logger.error(f"❌ Error closing Valkey connection: {e}")
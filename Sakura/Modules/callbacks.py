@@ -3,11 +3,14 @@ from pyrogram import Client, filters
 from pyrogram.types import CallbackQuery, LinkPreviewOptions
 from pyrogram.enums import ParseMode, ChatMemberStatus
 from pyrogram.errors import BadRequest, Forbidden
-from Sakura.Core.helpers import fetch_user, log_action, get_mention
+from Sakura.Core.helpers import fetch_user, log_action, get_mention, get_error
 from Sakura.Modules.keyboards import info_menu, help_menu, broadcast_menu
 from Sakura.Modules.messages import START_MESSAGES, HELP_MESSAGES, BROADCAST_MESSAGES
 from Sakura.Modules.typing import send_typing
 from Sakura.Chat.response import get_response
+from Sakura.Database.conversation import update_history
+from Sakura.Services.pregen import take_response
+from Sakura.Services.scheduler import schedule
 from Sakura.Modules.effects import send_effect
 from Sakura.Modules.payments import send_invoice
 from Sakura import state
@@ -42,7 +45,15 @@ async def start_callback_handler(client: Client, callback_query: CallbackQuery)
             await callback_query.answer(START_MESSAGES["callback_answers"]["hi"], show_alert=False)
             await send_typing(client, callback_query.message.chat.id, user_info)
             user_name = callback_query.from_user.first_name or ""
-            hi_response = await get_response("Hi", user_name, user_info, callback_query.from_user.id)
+            hi_response = take_response("Hi")
+            if hi_response:
+                await update_history(callback_query.from_user.id, "Hi", hi_response)
+                log_action("DEBUG", "🫙 Hi reply served from response pool", user_info)
+            else:
+                hi_response = await schedule(
+                    {**user_info, "user_id": callback_query.from_user.id},
+                    get_response("Hi", user_name, user_info, callback_query.from_user.id)
+                ) or get_error()
 
             if callback_query.message.chat.type == "private":
                 await send_effect(client, callback_query.message.chat.id, hi_response)
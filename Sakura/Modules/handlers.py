@@ -8,18 +8,25 @@ from Sakura.Core.helpers import fetch_user, log_action, should_reply, get_error,
 from Sakura.Services.limiter import check_limit
 from Sakura.Modules.reactions import handle_reaction
 from Sakura.Chat.images import reply_image
+from Sakura.Chat.audio import transcribe_voice, reply_voice_note
+from Sakura.Modules.messages import VOICE_MESSAGES, MEDIA_MESSAGES
 from Sakura.Chat.polls import reply_poll
 from Sakura.Modules.typing import send_typing
-from Sakura.Chat.chat import get_response
+from Sakura.Chat.chat import get_response, stream_response
 from Sakura.Chat.voice import generate_voice, should_send_voice, get_voice_intro
 from Sakura.Database.cache import set_last_message, get_last_message
 from Sakura.Services.broadcast import execute_broadcast
 from Sakura import state
-from Sakura.Core.config import OWNER_ID
+from Sakura.Core.config import OWNER_ID, AI_STREAMING, VOICE_INPUT_MODE, VOICE_MAX_SECONDS
 from Sakura.Modules.stickers import handle_sticker
-from Sakura.Modules.image import handle_image
+from Sakura.Modules.image import handle_image, handle_album, handle_media
 from Sakura.Modules.poll import handle_poll
 from Sakura.Services.tracking import track_user
+from Sakura.Services.bursts import collect_burst, run_generation
+from Sakura.Services.scheduler import schedule
+from Sakura.Services.fastpath import fast_reply
+from Sakura.Database.conversation import update_history
+from Sakura.Database.batch import update_batch
 
 @Client.on_message(
     (filters.text | filters.sticker | filters.voice | filters.video_note |
@@ -28,6 +35,22 @@ from Sakura.Services.tracking import track_user
 )
 async def handle_messages(client: Client, message: Message) -> None:
     """Handle all types of messages"""
+    # History, last message and response time are written in one pipeline at the end
+    async with update_batch():
+        await process_message(client, message)
+
+async def admit_album(client: Client, lead: Message) -> bool:
+    """Whether a collected album gets a reply: addressed to the bot in groups, and within the rate limit"""
+    user_info = fetch_user(lead)
+    if lead.chat.type.name.lower() in ['group', 'supergroup'] and not should_reply(lead, client.me.id, client):
+        return False
+    if await check_limit(user_info["user_id"], user_info["chat_id"], burst=True):
+        log_action("WARNING", "⏱️ Rate limited - ignoring album", user_info)
+        return False
+    return True
+
+async def process_message(client: Client, message: Message) -> None:
+    """Route a message to the matching handler and reply to it"""
     try:
         # Skip self messages (but allow channel messages)
         if message.from_user and message.from_user.is_self:
@@ -48,10 +71,17 @@ async def handle_messages(client: Client, message: Message) -> None:
             del state.broadcast_mode[message.from_user.id]
             return
 
-        if chat_type in ['group', 'supergroup'] and not should_reply(message, client.me.id, client):
+        # Albums are judged once, on their caption, after all items are collected
+        is_album = bool(message.media_group_id and message.photo)
+        if not is_album and chat_type in ['group', 'supergroup'] and not should_reply(message, client.me.id, client):
             return
 
-        if await check_limit(user_id, user_info["chat_id"]):
+        # Plain text bursts are coalesced below instead of being dropped
+        is_text = not (
+            message.sticker or message.photo or message.poll
+            or message.animation or message.document or message.video_note
+        )
+        if not is_album and await check_limit(user_id, user_info["chat_id"], burst=is_text):
             log_action("WARNING", "⏱️ Rate limited - ignoring message", user_info)
             return
 
@@ -60,17 +90,48 @@ async def handle_messages(client: Client, message: Message) -> None:
         if message.sticker:
             await handle_sticker(client, message)
             return
+        elif is_album:
+            await handle_album(client, message, admit=lambda lead: admit_album(client, lead))
+            return
         elif message.photo:
             await handle_image(client, message)
             return
         elif message.poll:
             await handle_poll(client, message)
             return
+        elif message.animation or message.video_note or message.document:
+            if not await handle_media(client, message):
+                # Nothing to look at: say so rather than answer the caption blind
+                await message.reply_text(random.choice(MEDIA_MESSAGES["unreadable"]))
+            return
+
+        # Voice notes are transcribed and then answered like text
+        voice_text = None
+        if message.voice:
+            if (message.voice.duration or 0) > VOICE_MAX_SECONDS:
+                log_action("INFO", f"🎙️ Voice note too long ({message.voice.duration}s)", user_info)
+                await message.reply_text(random.choice(VOICE_MESSAGES["too_long"]))
+                return
+            if VOICE_INPUT_MODE == "part":
+                await reply_voice_note(client, message, user_info)
+                return
+            transcript = await schedule(user_info, transcribe_voice(client, message.voice, user_info))
+            if not transcript:
+                await message.reply_text(random.choice(VOICE_MESSAGES["unclear"]))
+                return
+            voice_text = f"[Voice note] {transcript}"
 
-        # Default to text-based handling (including GIFs/animations)
-        user_message = message.text or message.caption or "Media message"
+        # Default to text-based handling
+        user_message = voice_text or message.text or message.caption or "Media message"
         log_action("INFO", f"💬 Message: '{user_message}'", user_info)
 
+        # Wait briefly for follow-up messages and answer them as one turn
+        burst = await collect_burst(user_id, user_info["chat_id"], user_message)
+        if burst is None:
+            log_action("DEBUG", "🧺 Message merged into a newer one", user_info)
+            return
+        user_message = "\n".join(burst)
+
         # Handle explicit "in your voice" request
         if "in your voice" in user_message.lower():
             last_bot_message = await get_last_message(user_id)
@@ -92,16 +153,59 @@ async def handle_messages(client: Client, message: Message) -> None:
         if await reply_poll(client, message, user_message, user_info):
             return
 
+        # "ok", "hmm", emoji only: answer locally instead of calling the model
+        quick_reply = fast_reply(user_id, user_message) if message.from_user and not voice_text else None
+        if quick_reply:
+            await message.reply_text(quick_reply)
+            await update_history(user_id, user_message, quick_reply)
+            await log_response(user_id)
+            log_action("INFO", f"⚡ Fast-path reply sent: '{quick_reply}'", user_info)
+            return
+
         # Start typing indicator before AI response generation
         asyncio.create_task(send_typing(client, message.chat.id, user_info))
 
-        # Get AI response (skip history for channel messages)
+        # Determine if voice should be used (contextual OR random 10%)
+        should_use_voice = should_send_voice(user_message, user_info) or random.random() < 0.1
+
+        # Text replies are streamed into the chat as they are generated
         is_channel_message = message.sender_chat and not message.from_user
-        ai_response = await get_response(user_message, user_id, user_info, save_history=not is_channel_message)
+        kind = "channel" if is_channel_message else None
+        if AI_STREAMING and not should_use_voice:
+            try:
+                ai_response = await run_generation(
+                    user_id, user_info["chat_id"], burst,
+                    schedule(user_info, stream_response(message, user_message, user_id, user_info, save_history=not is_channel_message, kind=kind))
+                )
+            except asyncio.CancelledError:
+                log_action("DEBUG", "✂️ Generation superseded by a newer message", user_info)
+                return
+            if not ai_response:
+                log_action("ERROR", "❌ Invalid AI response", user_info)
+                await message.reply_text(get_error())
+                return
+            if not is_channel_message:
+                try:
+                    await set_last_message(user_id, ai_response)
+                except Exception as cache_error:
+                    log_action("WARNING", f"⚠️ Failed to cache message: {cache_error}", user_info)
+            log_action("INFO", "✅ Response sent (streamed)", user_info)
+            await log_response(user_id)
+            return
+
+        # Get AI response (skip history for channel messages)
+        try:
+            ai_response = await run_generation(
+                user_id, user_info["chat_id"], burst,
+                schedule(user_info, get_response(user_message, user_id, user_info, save_history=not is_channel_message, kind=kind))
+            )
+        except asyncio.CancelledError:
+            log_action("DEBUG", "✂️ Generation superseded by a newer message", user_info)
+            return
 
         # Validate response before proceeding
         if not ai_response or not isinstance(ai_response, str):
-            log_action("ERROR", f"❌ Invalid AI response", user_info)
+            log_action("ERROR", "❌ Invalid AI response", user_info)
             await message.reply_text(get_error())
             return
 
@@ -110,18 +214,15 @@ async def handle_messages(client: Client, message: Message) -> None:
             try:
                 await set_last_message(user_id, ai_response)
             except Exception as cache_error:
-                log_action("WARNING", f"⚠️ Failed to cache message", user_info)
+                log_action("WARNING", f"⚠️ Failed to cache message: {cache_error}", user_info)
 
-        # Determine if voice should be used (contextual OR random 10%)
-        should_use_voice = should_send_voice(user_message, user_info) or random.random() < 0.1
-        
         voice_data = None
         if should_use_voice:
             # Add contextual intro if appropriate
             voice_intro = get_voice_intro(user_message)
             voice_text = voice_intro + ai_response
             
-            log_action("INFO", f"🎙️ Generating contextual voice message", user_info)
+            log_action("INFO", "🎙️ Generating contextual voice message", user_info)
             await client.send_chat_action(chat_id=message.chat.id, action=ChatAction.RECORD_AUDIO)
             voice_data = await generate_voice(voice_text)
 
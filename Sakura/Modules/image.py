@@ -1,4 +1,5 @@
 # Sakura/Modules/image.py
+import asyncio
 import random
 from pyrogram import Client
 from pyrogram.types import Message
@@ -7,6 +8,10 @@ from Sakura.Modules.reactions import CONTEXTUAL_REACTIONS
 from Sakura.Modules.effects import animate_reaction
 from Sakura.Modules.typing import send_typing
 from Sakura.Chat.chat import get_response
+from Sakura.Chat.images import load_image, image_prompt, index_photo
+from Sakura.Services.scheduler import schedule
+from Sakura.Services.albums import collect_album
+from Sakura.Chat.media import get_media, prepare_media
 
 async def handle_image(client: Client, message: Message) -> None:
     """Handle image messages with AI analysis"""
@@ -27,14 +32,23 @@ async def handle_image(client: Client, message: Message) -> None:
     await send_typing(client, message.chat.id, user_info)
 
     try:
-        log_action("DEBUG", "📥 Downloading image...", user_info)
-        image_file = await client.download_media(message.photo.file_id, in_memory=True)
-        image_bytes = image_file.getvalue()
-        log_action("DEBUG", f"📥 Image downloaded: {len(image_bytes)} bytes", user_info)
-
         caption = message.caption or ""
+        await index_photo(user_info["user_id"], message.photo)
+
+        async def analyze():
+            description, image_bytes, mime_type = await load_image(client, message.photo, user_info)
+            if description:
+                # Known image: a text call with its cached description is enough
+                return await get_response(image_prompt(caption, description), message.from_user.id, user_info, kind="image")
+            if not image_bytes:
+                return None
+            log_action("DEBUG", f"📥 Image downloaded: {len(image_bytes)} bytes ({mime_type})", user_info)
+            return await get_response(caption, message.from_user.id, user_info, image_bytes=image_bytes, mime_type=mime_type)
 
-        response = await get_response(caption, message.from_user.id, user_info, image_bytes=image_bytes)
+        response = await schedule(user_info, analyze())
+        if not response:
+            await message.reply_text(get_error())
+            return
 
         log_action("DEBUG", f"📤 Sending image analysis: '{response}'", user_info)
         await message.reply_text(response)
@@ -43,3 +57,105 @@ async def handle_image(client: Client, message: Message) -> None:
     except Exception as e:
         log_action("ERROR", f"❌ Error analyzing image: {e}", user_info)
         await message.reply_text(get_error())
+
+async def handle_album(client: Client, message: Message, admit=None) -> None:
+    """Handle a photo album as one multi-image request with a single reply
+
+    Args:
+        admit: Async check run once on the collected album; see collect_album
+    """
+    album = await collect_album(message, admit)
+    if album is None:
+        return
+
+    first = album[0]
+    user_info = fetch_user(first)
+    photos = [m for m in album if m.photo]
+    log_action("INFO", f"🗂️ Album received with {len(photos)} photos", user_info)
+
+    try:
+        emoji_to_react = random.choice(CONTEXTUAL_REACTIONS["love"])
+        await animate_reaction(
+            chat_id=first.chat.id,
+            message_id=first.id,
+            emoji=emoji_to_react
+        )
+    except Exception as e:
+        log_action("WARNING", f"⚠️ Could not send analysis reaction for album: {e}", user_info)
+
+    await send_typing(client, first.chat.id, user_info)
+
+    caption = next((m.caption for m in album if m.caption), "")
+    for m in photos:
+        await index_photo(user_info["user_id"], m.photo)
+
+    async def analyze():
+        # Cached descriptions go in as text, the rest as image parts of one request
+        loaded = await asyncio.gather(
+            *(load_image(client, m.photo, user_info, describe=False) for m in photos),
+            return_exceptions=True
+        )
+        descriptions, images = [], []
+        for item in loaded:
+            if isinstance(item, Exception):
+                log_action("WARNING", f"⚠️ Skipping album photo: {item}", user_info)
+                continue
+            description, image_bytes, mime_type = item
+            if description:
+                descriptions.append(description)
+            elif image_bytes:
+                images.append((image_bytes, mime_type))
+        if not descriptions and not images:
+            return None
+
+        log_action("DEBUG", f"📥 Album ready: {len(images)} images, {len(descriptions)} cached descriptions", user_info)
+        prompt = "\n".join(f"[Image: {description}]" for description in descriptions)
+        prompt = "\n".join(part for part in (prompt, caption) if part)
+        if images and not prompt:
+            prompt = "What do you see in these images?"
+        return await get_response(prompt, user_info["user_id"], user_info, images=images, kind="image")
+
+    try:
+        response = await schedule(user_info, analyze())
+        await first.reply_text(response or get_error())
+        log_action("INFO", "✅ Album analysis response sent successfully", user_info)
+    except Exception as e:
+        log_action("ERROR", f"❌ Error analyzing album: {e}", user_info)
+        await first.reply_text(get_error())
+
+async def handle_media(client: Client, message: Message) -> bool:
+    """Handle GIFs, video notes and documents through their thumbnail or a keyframe
+
+    Returns:
+        bool: False if there was nothing to look at or no reply was generated,
+        so the caller should send a fallback reply
+    """
+    user_info = fetch_user(message)
+    media, label = get_media(message)
+    caption = message.caption or ""
+
+    async def analyze():
+        description, image_bytes, mime_type = await load_image(
+            client, media, user_info, fetch=lambda: prepare_media(client, media)
+        )
+        if description:
+            return await get_response(image_prompt(caption, description, label), user_info["user_id"], user_info, kind="image")
+        if not image_bytes:
+            return None
+        prompt = f"[{label}] {caption}".strip()
+        return await get_response(prompt, user_info["user_id"], user_info, image_bytes=image_bytes, mime_type=mime_type)
+
+    log_action("INFO", f"🎞️ {label} received", user_info)
+    await send_typing(client, message.chat.id, user_info)
+    try:
+        response = await schedule(user_info, analyze())
+    except Exception as e:
+        log_action("ERROR", f"❌ Error analyzing {label.lower()}: {e}", user_info)
+        response = None
+
+    if not response:
+        log_action("DEBUG", f"🎞️ No preview for {label.lower()} within size caps", user_info)
+        return False
+    await message.reply_text(response)
+    log_action("INFO", f"✅ {label} analysis response sent successfully", user_info)
+    return True
@@ -124,6 +124,59 @@ It will be automatically broadcasted to all groups.
     }
 }
 
+# Voice Note Input Messages Dictionary
+VOICE_MESSAGES = {
+    "too_long": [
+        "Itna lamba voice note nahi sun paungi 🙈 thoda chhota bhejo na",
+        "Uff, bohot lamba hai ye 😅 short mein bolo na"
+    ],
+    "unclear": [
+        "Voice note samajh nahi aaya 🥺 ek baar likh ke bhejo na",
+        "Kuch clear sunai nahi diya 🙈 type karke batao na"
+    ]
+}
+
+# Media Messages Dictionary (GIFs, video notes and files with nothing to look at)
+MEDIA_MESSAGES = {
+    "unreadable": [
+        "Ye khul hi nahi raha mere paas 🥺 screenshot bhej do na",
+        "Isme kuch dikh nahi raha 🙈 batao na kya hai ismein"
+    ]
+}
+
+# Fast-Path Replies Dictionary (low-information messages answered without the AI)
+FAST_REPLIES = {
+    "ack": [
+        "Hmm hmm 🌸",
+        "Acha ji 😌",
+        "Theek hai 💕",
+        "Okie 🌸",
+        "Hmm, aur batao? 🙂"
+    ],
+    "laugh": [
+        "Hehe 😄",
+        "Haha 🤭",
+        "😂😂",
+        "Hasi aa gayi na 😆"
+    ],
+    "thanks": [
+        "Arey koi baat nahi 🌸",
+        "Welcome ji 😊",
+        "Anytime 💕"
+    ],
+    "love": [
+        "💕",
+        "Aww 🥰",
+        "🌸💞"
+    ],
+    "emoji": [
+        "🌸",
+        "Hehe 🙈",
+        "😊",
+        "🤭"
+    ]
+}
+
 # Fallback responses for when API is unavailable or errors occur
 RESPONSES = [
     "🙃🙃"
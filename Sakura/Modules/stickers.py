@@ -1,7 +1,6 @@
 # Sakura/Modules/stickers.py
 import random
 import asyncio
-import orjson
 import base64
 from pyrogram import Client, raw
 from pyrogram.types import Message
@@ -9,6 +8,8 @@ from pyrogram.enums import ChatType
 from Sakura.Core.helpers import fetch_user, log_action
 from Sakura.Modules.typing import sticker_action
 from Sakura.Core.logging import logger
+from Sakura.Database.codec import encode_value, decode_fresh
+from Sakura.Database.nearcache import near_get, near_set, invalidate, MISSING
 from Sakura import state
 
 
@@ -42,7 +43,8 @@ async def load_stickers(client: Client, pack_link: str, cache_key: str):
             for doc in sticker_set.documents
         ]
 
-        await state.valkey_client.set(cache_key, orjson.dumps(stickers_to_cache))
+        await state.valkey_raw.set(cache_key, encode_value(stickers_to_cache))
+        await invalidate(cache_key)
         logger.info(f"✅ Loaded and cached {len(stickers_to_cache)} stickers from {pack_name}.")
 
     except Exception as e:
@@ -55,12 +57,15 @@ async def get_random_sticker(cache_key: str, user_info: dict) -> dict | None:
         log_action("ERROR", "Valkey client not available for getting sticker.", user_info)
         return None
 
-    cached_stickers = await state.valkey_client.get(cache_key)
-    if not cached_stickers:
-        log_action("WARNING", f"⚠️ No stickers found in cache for key: {cache_key}", user_info)
-        return None
+    sticker_list, generation = near_get(cache_key)
+    if sticker_list is MISSING:
+        cached_stickers = await state.valkey_raw.get(cache_key)
+        if not cached_stickers:
+            log_action("WARNING", f"⚠️ No stickers found in cache for key: {cache_key}", user_info)
+            return None
+        sticker_list = await decode_fresh(state.valkey_raw, cached_stickers)
+        near_set(cache_key, sticker_list, generation)
 
-    sticker_list = orjson.loads(cached_stickers)
     return random.choice(sticker_list) if sticker_list else None
 
 
@@ -0,0 +1,51 @@
+# Sakura/Services/albums.py
+import asyncio
+from typing import Awaitable, Callable, Optional, List
+from pyrogram.types import Message
+from Sakura.Core.config import ALBUM_WINDOW, ALBUM_MAX_IMAGES
+from Sakura.Core.logging import logger
+from Sakura import state
+
+
+async def collect_album(
+    message: Message,
+    admit: Optional[Callable[[Message], Awaitable[bool]]] = None
+) -> Optional[List[Message]]:
+    """Buffer the messages of a media group (album) and hand them over once.
+
+    Telegram delivers an album as separate messages sharing a media_group_id.
+    Each one waits ALBUM_WINDOW seconds after the latest arrival; only the
+    last message gets the whole album back, the others get None and should
+    stop. At most ALBUM_MAX_IMAGES messages are kept per album.
+
+    Args:
+        message: One message of the album
+        admit: Decides once per album whether it is answered, given its
+            captioned message (or the first one when none has a caption)
+
+    Returns:
+        list: The album's messages in send order, for the last message
+        None: If a later message of the album took over, or admit refused it
+    """
+    key = f"{message.chat.id}:{message.media_group_id}"
+    album = state.media_groups.setdefault(key, {"messages": [], "seq": 0})
+
+    if len(album["messages"]) < ALBUM_MAX_IMAGES:
+        album["messages"].append(message)
+    album["seq"] += 1
+    seq = album["seq"]
+
+    await asyncio.sleep(ALBUM_WINDOW)
+
+    if album["seq"] != seq:
+        return None
+
+    state.media_groups.pop(key, None)
+    messages = sorted(album["messages"], key=lambda m: m.id)
+    logger.debug(f"🗂️ Collected album {key} with {len(messages)} items")
+
+    lead = next((m for m in messages if m.caption), messages[0])
+    if admit and not await admit(lead):
+        logger.debug(f"🗂️ Album {key} not admitted")
+        return None
+    return messages
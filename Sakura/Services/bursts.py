@@ -0,0 +1,60 @@
+# Sakura/Services/bursts.py
+import asyncio
+from typing import Optional, List
+from Sakura.Core.config import BURST_WINDOW
+from Sakura.Core.logging import logger
+from Sakura import state
+
+
+async def collect_burst(user_id: int, chat_id: int, text: str) -> Optional[List[str]]:
+    """Debounce a user's messages per chat into a single turn.
+
+    Every message waits BURST_WINDOW seconds; only the last message of a
+    burst gets the collected texts back, earlier ones get None and should
+    stop. A generation still in flight for the same user and chat is
+    cancelled and its texts are carried into the new burst.
+
+    Returns:
+        list: All texts of the burst, oldest first, for the last message
+        None: If a newer message took over this burst
+    """
+    key = f"{user_id}:{chat_id}"
+    burst = state.message_bursts.setdefault(key, {"texts": [], "seq": 0})
+
+    active = state.active_generations.pop(key, None)
+    if active and not active["task"].done():
+        active["task"].cancel()
+        burst["texts"][:0] = active["texts"]
+        logger.debug(f"✂️ Cancelled superseded generation for {key}")
+
+    burst["texts"].append(text)
+    burst["seq"] += 1
+    seq = burst["seq"]
+
+    if BURST_WINDOW > 0:
+        await asyncio.sleep(BURST_WINDOW)
+
+    if burst["seq"] != seq:
+        return None
+
+    state.message_bursts.pop(key, None)
+    if len(burst["texts"]) > 1:
+        logger.debug(f"🧺 Coalesced {len(burst['texts'])} messages for {key}")
+    return burst["texts"]
+
+
+async def run_generation(user_id: int, chat_id: int, texts: List[str], coro):
+    """Run a generation that a newer message from the same user may cancel.
+
+    Raises:
+        asyncio.CancelledError: If a newer message superseded the generation
+    """
+    key = f"{user_id}:{chat_id}"
+    task = asyncio.create_task(coro)
+    entry = {"task": task, "texts": texts}
+    state.active_generations[key] = entry
+    try:
+        return await task
+    finally:
+        if state.active_generations.get(key) is entry:
+            del state.active_generations[key]
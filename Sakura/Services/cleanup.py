@@ -24,6 +24,9 @@ async def cleanup_conversations():
                     if user_id in state.conversation_history:
                         del state.conversation_history[user_id]
                         conversations_cleaned += 1
+                    state.conversation_summaries.pop(user_id, None)
+                    state.recent_media.pop(user_id, None)
+                    state.fast_path_users.pop(user_id, None)
                     if user_id in state.user_last_response_time:
                         del state.user_last_response_time[user_id]
 
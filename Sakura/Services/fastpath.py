@@ -0,0 +1,106 @@
+# Sakura/Services/fastpath.py
+import random
+import re
+import time
+import unicodedata
+from typing import Optional, Tuple
+from Sakura.Core.config import FAST_PATH, FAST_PATH_THRESHOLD, FAST_PATH_USER_CAP, FAST_PATH_WINDOW
+from Sakura.Core.logging import logger
+from Sakura.Modules.messages import FAST_REPLIES
+from Sakura import state
+
+# Known low-information words, after repeated letters are squeezed ("hmmmm" → "hm")
+FAST_WORDS = {
+    "ack": {
+        "ok", "oke", "okie", "okay", "k", "kk", "hm", "hmk", "acha", "acha ji", "achha", "accha",
+        "thik", "thik hai", "theek", "theek hai", "fine", "alright", "done", "haan", "han", "hn", "ji",
+        "ok ji", "cool", "nice", "sahi", "sahi hai", "ohh", "oh", "ah", "achaa"
+    },
+    "laugh": {"lol", "haha", "hehe", "lmao", "lmfao", "rofl", "hihi", "xd"},
+    "thanks": {"thanks", "thank you", "thanku", "thx", "ty", "tysm", "shukriya", "dhanyavad"},
+}
+
+LAUGH_PATTERN = re.compile(r"(?:h+[aeiou]+){2,}h*|l+o+l+|l+m+f*a+o+|x+d+")
+LOVE_EMOJI = set("❤💕💖💗💓💞💘💝🥰😍😘♥")
+LAUGH_EMOJI = set("😂🤣😆😹😄😁")
+
+
+def _plain(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = re.sub(r"[^\w\s]", "", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _squeeze(text: str) -> str:
+    return re.sub(r"(\w)\1+", r"\1", _plain(text))
+
+
+SQUEEZED_WORDS = {category: {_squeeze(word) for word in words} for category, words in FAST_WORDS.items()}
+
+
+def _is_emoji_only(text: str) -> bool:
+    stripped = [ch for ch in text if not ch.isspace()]
+    return bool(stripped) and all(
+        unicodedata.category(ch) in ("So", "Sk", "Mn", "Cf") for ch in stripped
+    )
+
+
+def classify(text: str) -> Tuple[Optional[str], float]:
+    """Classify a message as a low-information one, with a confidence score.
+
+    Returns:
+        tuple: (category from FAST_REPLIES or None, score between 0 and 1)
+    """
+    if not text or len(text) > 40:
+        return None, 0.0
+
+    if _is_emoji_only(text):
+        emojis = set(text)
+        if emojis & LOVE_EMOJI:
+            return "love", 0.9
+        if emojis & LAUGH_EMOJI:
+            return "laugh", 0.9
+        return "emoji", 0.85
+
+    plain = _plain(text)
+    squeezed = _squeeze(text)
+    for category, words in FAST_WORDS.items():
+        if plain in words:
+            return category, 1.0
+        # Stretched spellings ("okkk", "hmmmm", "achhaa") match slightly less surely
+        if squeezed in SQUEEZED_WORDS[category]:
+            return category, 0.9
+    if LAUGH_PATTERN.fullmatch(plain):
+        return "laugh", 0.9
+    return None, 0.0
+
+
+def fast_reply(user_id: int, text: str) -> Optional[str]:
+    """Pick a local reply for a low-information message, if one is allowed.
+
+    A user gets at most FAST_PATH_USER_CAP local replies per FAST_PATH_WINDOW;
+    beyond that the message goes to the model so the bot does not feel canned.
+
+    Returns:
+        str: The reply to send instead of calling the model
+        None: If the message should go to the model
+    """
+    if not FAST_PATH:
+        return None
+
+    category, score = classify(text)
+    if category is None or score < FAST_PATH_THRESHOLD:
+        return None
+
+    now = time.time()
+    recent = [t for t in state.fast_path_users.get(user_id, []) if now - t < FAST_PATH_WINDOW]
+    if len(recent) >= FAST_PATH_USER_CAP:
+        state.fast_path_stats["capped"] += 1
+        state.fast_path_users[user_id] = recent
+        return None
+    recent.append(now)
+    state.fast_path_users[user_id] = recent
+
+    state.fast_path_stats["saved"] += 1
+    logger.debug(f"⚡ Fast-path '{category}' reply for user {user_id} (score {score:.2f})")
+    return random.choice(FAST_REPLIES[category])
@@ -1,36 +1,69 @@
 # Sakura/Services/limiter.py
 import time
-from Sakura.Core.config import MESSAGE_LIMIT, RATE_LIMIT_COUNT, RATE_LIMIT_TTL
+from Sakura.Core.config import MESSAGE_LIMIT, RATE_LIMIT_COUNT, RATE_LIMIT_TTL, SESSION_TTL
 from Sakura.Core.logging import logger
+from Sakura.Database.sessions import user_key
 from Sakura import state
 
-async def check_limit(user_id: int, chat_id: int) -> bool:
+# Counts messages per chat in fields of the user hash and returns the count,
+# or -1 while the hard limit is in force. Uses server time so every instance agrees.
+# Starting a new window also deletes the fields of every chat whose window and
+# block have both run out, so chats a user has left do not pile up in the hash.
+CHECK_LIMIT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local chat = ARGV[1]
+local blocked = tonumber(redis.call('HGET', KEYS[1], 'rl_block:' .. chat) or 0)
+if blocked > now then
+    return -1
+end
+local window = tonumber(ARGV[2])
+local count = 1
+local start = tonumber(redis.call('HGET', KEYS[1], 'rl_start:' .. chat) or 0)
+if now - start < window then
+    count = redis.call('HINCRBY', KEYS[1], 'rl_count:' .. chat, 1)
+else
+    for _, field in ipairs(redis.call('HKEYS', KEYS[1])) do
+        local other = string.match(field, '^rl_start:(.+)$')
+        if other then
+            local values = redis.call('HMGET', KEYS[1], field, 'rl_block:' .. other)
+            if now - tonumber(values[1]) >= window and tonumber(values[2] or 0) <= now then
+                redis.call('HDEL', KEYS[1], field, 'rl_count:' .. other, 'rl_block:' .. other)
+            end
+        end
+    end
+    redis.call('HSET', KEYS[1], 'rl_start:' .. chat, tostring(now), 'rl_count:' .. chat, 1)
+end
+if count > tonumber(ARGV[3]) then
+    redis.call('HSET', KEYS[1], 'rl_block:' .. chat, tostring(now + tonumber(ARGV[4])))
+end
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return count
+"""
+
+_limit_script = None
+
+async def check_limit(user_id: int, chat_id: int, burst: bool = False) -> bool:
     """
     Checks if a user is rate-limited based on a per-user, per-chat basis.
+
+    With burst=True, extra messages inside the MESSAGE_LIMIT window are let
+    through for coalescing; only the hard limit applies.
     """
+    global _limit_script
     if state.valkey_client:
         try:
-            hard_limit_key = f"hard_rate_limit:{user_id}:{chat_id}"
-            if await state.valkey_client.exists(hard_limit_key):
-                return True
-
-            message_count_key = f"message_count:{user_id}:{chat_id}"
-            pipe = state.valkey_client.pipeline()
-            pipe.incr(message_count_key)
-            pipe.ttl(message_count_key)
-            results = await pipe.execute()
-
-            count = results[0]
-            ttl = results[1]
-
-            if ttl == -1:
-                await state.valkey_client.expire(message_count_key, int(MESSAGE_LIMIT))
+            if _limit_script is None:
+                _limit_script = state.valkey_client.register_script(CHECK_LIMIT)
+            count = await _limit_script(
+                keys=[user_key(user_id)],
+                args=[chat_id, MESSAGE_LIMIT, RATE_LIMIT_COUNT, RATE_LIMIT_TTL, SESSION_TTL]
+            )
 
-            if count > RATE_LIMIT_COUNT:
-                await state.valkey_client.setex(hard_limit_key, RATE_LIMIT_TTL, "1")
+            if count < 0 or count > RATE_LIMIT_COUNT:
                 return True
 
-            if count > 1:
+            if count > 1 and not burst:
                 return True
 
             return False
@@ -55,7 +88,7 @@ async def check_limit(user_id: int, chat_id: int) -> bool:
         state.rate_limited_users[key] = current_time + RATE_LIMIT_TTL
         return True
 
-    if len(timestamps) > 1:
+    if len(timestamps) > 1 and not burst:
         return True
 
     return False
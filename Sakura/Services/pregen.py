@@ -0,0 +1,80 @@
+# Sakura/Services/pregen.py
+import asyncio
+import time
+from typing import Optional
+from Sakura.Core.config import PREGEN_PROMPTS, PREGEN_POOL_SIZE, PREGEN_LOW_WATER, PREGEN_TTL
+from Sakura.Core.logging import logger
+from Sakura.Core.utils import spawn
+from Sakura.Chat.chat import get_response
+from Sakura import state
+
+# Generic identity for replies generated ahead of time, outside any user's chat
+PREGEN_INFO = {
+    "user_id": 0,
+    "first_name": "Pregen",
+    "full_name": "Pregen",
+    "chat_title": "Response pool",
+    "chat_type": "internal",
+}
+
+_refilling: set = set()
+
+
+async def fill_pools() -> None:
+    """Warm up the response pool for every configured fixed prompt."""
+    if not state.llm_backend:
+        return
+    await asyncio.gather(*(refill_pool(prompt) for prompt in PREGEN_PROMPTS))
+
+
+async def refill_pool(prompt: str) -> None:
+    """Generate replies for a fixed prompt until its pool is full again."""
+    if prompt in _refilling:
+        return
+    _refilling.add(prompt)
+    try:
+        pool = state.response_pools.setdefault(prompt, [])
+        drop_stale(pool)
+        missing = PREGEN_POOL_SIZE - len(pool)
+        if missing <= 0:
+            return
+
+        replies = await asyncio.gather(
+            *(get_response(prompt, 0, PREGEN_INFO, save_history=False) for _ in range(missing)),
+            return_exceptions=True
+        )
+        added = 0
+        for reply in replies:
+            if isinstance(reply, str) and reply:
+                pool.append((time.time(), reply))
+                added += 1
+        logger.debug(f"🫙 Response pool for '{prompt}' refilled with {added} replies ({len(pool)} ready)")
+    except Exception as e:
+        logger.error(f"❌ Failed to refill response pool for '{prompt}': {e}")
+    finally:
+        _refilling.discard(prompt)
+
+
+def drop_stale(pool: list) -> None:
+    """Discard pooled replies older than PREGEN_TTL so answers stay fresh."""
+    cutoff = time.time() - PREGEN_TTL
+    while pool and pool[0][0] < cutoff:
+        pool.pop(0)
+
+
+def take_response(prompt: str) -> Optional[str]:
+    """Pop a ready-made reply for a fixed prompt, refilling in the background when low.
+
+    Returns None when the pool is empty, so callers fall back to a live call.
+    """
+    if prompt not in PREGEN_PROMPTS:
+        return None
+
+    pool = state.response_pools.setdefault(prompt, [])
+    drop_stale(pool)
+    reply = pool.pop(0)[1] if pool else None
+
+    if len(pool) <= PREGEN_LOW_WATER and state.llm_backend:
+        spawn(refill_pool(prompt))
+
+    return reply
@@ -0,0 +1,173 @@
+# Sakura/Services/scheduler.py
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Optional
+from Sakura.Core.config import OWNER_ID, AI_CONCURRENCY, SCHEDULER_DEPTHS, SCHEDULER_USER_DEPTH
+from Sakura.Core.logging import logger
+from Sakura import state
+
+# Priority lanes, highest first; "background" is work no user is waiting on
+LANES = ["owner", "private", "supporters", "groups", "background"]
+
+
+def get_lane(user_info: Dict[str, any]) -> str:
+    """Pick the priority lane for a request from its user info."""
+    user_id = user_info.get("user_id")
+    if user_id == OWNER_ID:
+        return "owner"
+    if user_info.get("chat_type") == "private":
+        return "private"
+    if user_id in state.supporter_ids:
+        return "supporters"
+    return "groups"
+
+
+class LLMScheduler:
+    """Admit LLM work by priority lane with round-robin fairness between users.
+
+    At most `slots` requests run at once. Waiting requests are served from the
+    highest non-empty lane; inside a lane users take turns, so one chatty user
+    or group cannot starve the others. Each user may have at most
+    `user_depth` requests waiting per lane. When a lane is full, the oldest
+    waiter of the user with the most queued requests is shed to make room,
+    unless the newcomer is that user, who is rejected instead.
+    """
+
+    def __init__(self, slots: int, depths: Dict[str, int], user_depth: int = SCHEDULER_USER_DEPTH):
+        self.slots = slots
+        self.depths = depths
+        self.user_depth = user_depth
+        self.running = 0
+        self.queues = {lane: OrderedDict() for lane in LANES}
+        self.queued = {lane: 0 for lane in LANES}
+        self.metrics = {
+            lane: {"submitted": 0, "rejected": 0, "waits": deque(maxlen=500)}
+            for lane in LANES
+        }
+
+    def _pending(self) -> bool:
+        return any(self.queued.values())
+
+    async def submit(self, lane: str, user_id: int, coro):
+        """Run coro once a slot is granted.
+
+        Returns:
+            The coroutine's result, or None if the lane was full
+        """
+        metrics = self.metrics[lane]
+        metrics["submitted"] += 1
+
+        if self.running < self.slots and not self._pending():
+            self.running += 1
+            metrics["waits"].append(0.0)
+        else:
+            if len(self.queues[lane].get(user_id, ())) >= self.user_depth:
+                metrics["rejected"] += 1
+                coro.close()
+                logger.warning(f"🚦 {user_id} already has {self.user_depth} LLM requests queued in lane '{lane}', rejecting")
+                return None
+            if self.queued[lane] >= self.depths.get(lane, 100) and not self._shed(lane, user_id):
+                metrics["rejected"] += 1
+                coro.close()
+                logger.warning(f"🚦 LLM queue full for lane '{lane}', rejecting request from {user_id}")
+                return None
+
+            waiter = asyncio.get_running_loop().create_future()
+            self.queues[lane].setdefault(user_id, deque()).append(waiter)
+            self.queued[lane] += 1
+            start = time.monotonic()
+            try:
+                granted = await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Slot was granted just as we were cancelled; hand it on
+                    self._release()
+                coro.close()
+                raise
+            if not granted:
+                # Shed to make room for another user's request
+                coro.close()
+                return None
+            metrics["waits"].append(time.monotonic() - start)
+
+        try:
+            return await coro
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        self.running -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self.running < self.slots:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            self.running += 1
+            waiter.set_result(True)
+
+    def _shed(self, lane: str, user_id: int) -> bool:
+        """Drop the oldest waiter of the lane's heaviest user to make room for user_id.
+
+        Returns:
+            bool: False if user_id already has the most requests queued
+        """
+        users = self.queues[lane]
+        own = len(users.get(user_id, ()))
+        heaviest = max(users, key=lambda user: len(users[user]), default=None)
+        if heaviest is None or heaviest == user_id or len(users[heaviest]) <= own:
+            return False
+
+        waiters = users[heaviest]
+        waiter = waiters.popleft()
+        self.queued[lane] -= 1
+        if not waiters:
+            del users[heaviest]
+        if not waiter.done():
+            waiter.set_result(False)
+        self.metrics[lane]["rejected"] += 1
+        logger.warning(f"🚦 LLM queue full for lane '{lane}', shed the oldest request of {heaviest} for {user_id}")
+        return True
+
+    def _next_waiter(self):
+        for lane in LANES:
+            users = self.queues[lane]
+            while users:
+                user_id, waiters = users.popitem(last=False)
+                waiter = waiters.popleft()
+                self.queued[lane] -= 1
+                if waiters:
+                    # Back of the line for this user's next request
+                    users[user_id] = waiters
+                if not waiter.done():
+                    return waiter
+        return None
+
+    def stats(self) -> Dict[str, dict]:
+        """Queue depth, rejections and wait times (ms) per lane."""
+        result = {}
+        for lane in LANES:
+            waits = sorted(self.metrics[lane]["waits"])
+            p95 = waits[int(len(waits) * 0.95) - 1] if waits else 0.0
+            result[lane] = {
+                "queued": self.queued[lane],
+                "submitted": self.metrics[lane]["submitted"],
+                "rejected": self.metrics[lane]["rejected"],
+                "avg_wait_ms": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+                "p95_wait_ms": round(p95 * 1000, 1),
+            }
+        return result
+
+
+scheduler = LLMScheduler(AI_CONCURRENCY, SCHEDULER_DEPTHS)
+
+
+async def schedule(user_info: Dict[str, any], coro, lane: Optional[str] = None):
+    """Queue LLM work for a user in their priority lane, or in the given one.
+
+    Returns:
+        The coroutine's result, or None if the request was rejected
+    """
+    return await scheduler.submit(lane or get_lane(user_info), user_info.get("user_id"), coro)
@@ -5,6 +5,10 @@ from pyrogram import Client
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup, LinkPreviewOptions, Message
 from pyrogram.enums import ParseMode, ChatType
 from Sakura.Core.helpers import log_action
+from Sakura.Services.scheduler import scheduler
+from Sakura.Chat.clients import key_summary
+from Sakura.Chat.breaker import breaker_summary
+from Sakura.Database.nearcache import near_cache_summary
 from Sakura import state
 
 async def send_stats(chat_id: int, client: Client, is_refresh: bool = False, message: Message = None):
@@ -27,6 +31,50 @@ async def send_stats(chat_id: int, client: Client, is_refresh: bool = False, mes
         uptime_str = f"{days}d {hours}h {minutes}m {seconds}s"
 
         cpu_percent = psutil.cpu_percent(interval=0.1)
+
+        keys = key_summary()
+        key_lines = "\n".join(
+            f"{'╰─' if i == len(keys) - 1 else '├─'} Key #{k['index']}{' (active)' if k['active'] else ''}: "
+            f"{k['rpm']} rpm, {k['errors']} × 429" + (f", cooling {k['cooldown']}s" if k['cooldown'] else "")
+            for i, k in enumerate(keys)
+        ) or "╰─ No keys configured"
+
+        circuits = breaker_summary()
+        circuit_lines = "\n".join(
+            f"{'╰─' if i == len(circuits) - 1 else '├─'} {model}: {c['state']}, {c['trips']} trips"
+            + (f", p95 {c['p95']:.1f}s" if c['p95'] is not None else "")
+            for i, (model, c) in enumerate(circuits.items())
+        ) or "╰─ No calls yet"
+
+        lane_stats = scheduler.stats()
+        queue_lines = "\n".join(
+            f"{'╰─' if i == len(lane_stats) - 1 else '├─'} {lane.title()}: {s['queued']} queued, "
+            f"p95 {s['p95_wait_ms']}ms, {s['rejected']} rejected"
+            for i, (lane, s) in enumerate(lane_stats.items())
+        )
+        caches = state.ai_cache_stats
+        cache_lines = "\n".join(
+            f"├─ {name.title()}: {c['hits']} hits, {c['misses']} misses"
+            + (f" ({c['hits'] / (c['hits'] + c['misses']):.0%})" if c['hits'] + c['misses'] else "")
+            for name, c in caches.items()
+        ) + f"\n╰─ Fast-path: {state.fast_path_stats['saved']} LLM calls saved, {state.fast_path_stats['capped']} capped"
+
+        near = near_cache_summary()
+        near_lines = "\n".join(
+            f"{'╰─' if i == len(near) - 1 else '├─'} {name.title()}: {c['entries']} entries, "
+            f"{c['hits']} hits, {c['misses']} misses"
+            + (f" ({c['hits'] / (c['hits'] + c['misses']):.0%})" if c['hits'] + c['misses'] else "")
+            + f", {c['invalidations']} invalidated"
+            for i, (name, c) in enumerate(near.items())
+        )
+        tokens = state.prompt_token_stats
+        prompts = tokens["prompts"] or 1
+        token_lines = (
+            f"├─ Prompts: {tokens['prompts']}\n"
+            f"├─ Avg history estimate: {tokens['estimated'] // prompts} tokens\n"
+            f"├─ Avg billed prompt: {tokens['actual'] // prompts} tokens\n"
+            f"╰─ Largest prompt: {tokens['max']} tokens"
+        )
         memory = psutil.virtual_memory()
 
         db_stats = {
@@ -61,7 +109,19 @@ async def send_stats(chat_id: int, client: Client, is_refresh: bool = False, mes
 ╰─ Total Revenue: {db_stats['total_revenue']} Star</blockquote>
 <blockquote>📡 System Resources
 ├─ CPU Usage: {cpu_percent}%
-╰─ Memory: {memory.percent}% ({memory.used // (1024 ** 3)}GB / {memory.total // (1024 ** 3)}GB)</blockquote>"""
+╰─ Memory: {memory.percent}% ({memory.used // (1024 ** 3)}GB / {memory.total // (1024 ** 3)}GB)</blockquote>
+<blockquote>🔑 Gemini Keys
+{key_lines}</blockquote>
+<blockquote>⚡ AI Circuits
+{circuit_lines}</blockquote>
+<blockquote>🚦 AI Queue ({scheduler.running}/{scheduler.slots} running)
+{queue_lines}</blockquote>
+<blockquote>🗃️ AI Caches
+{cache_lines}</blockquote>
+<blockquote>🧮 Prompt Tokens
+{token_lines}</blockquote>
+<blockquote>🧊 Near Cache ({state.near_cache_mode or 'off'})
+{near_lines}</blockquote>"""
 
         keyboard = [[InlineKeyboardButton("🍒 Boobies", callback_data="refresh_stats")]]
         reply_markup = InlineKeyboardMarkup(keyboard)
@@ -12,11 +12,15 @@ from Sakura.Core.config import (
 from Sakura.Core.logging import logger
 from Sakura.Modules.stickers import load_stickers
 from Sakura.Core.server import start_server_thread
-from Sakura.Core.utils import validate_config
+from Sakura.Core.utils import validate_config, spawn
 from Sakura.Database.database import connect_database, close_database
 from Sakura.Database.valkey import connect_cache, close_cache
 from Sakura.Services.cleanup import cleanup_conversations
 from Sakura.Chat.chat import init_client
+from Sakura.Services.pregen import fill_pools
+from Sakura.Database.conversation import migrate_history
+from Sakura.Database.sessions import migrate_user_keys
+from Sakura.Database.nearcache import run_invalidation
 from Sakura import state
 from Sakura.Modules.commands import COMMANDS
 
@@ -55,6 +59,11 @@ async def post_init(app: Client):
         await load_all_stickers(app)
 
     state.cleanup_task = asyncio.create_task(cleanup_conversations())
+    spawn(fill_pools())
+    if valkey_success:
+        spawn(migrate_history())
+        spawn(migrate_user_keys())
+        state.near_cache_task = asyncio.create_task(run_invalidation())
     logger.info("🌸 Sakura Bot initialization completed!")
 
 
@@ -79,6 +88,9 @@ async def post_shutdown(app: Client):
         except asyncio.CancelledError:
             logger.info("✅ Cleanup task cancelled successfully")
 
+    if state.near_cache_task and not state.near_cache_task.done():
+        state.near_cache_task.cancel()
+
     logger.info("📊 Closing database connections...")
     await close_database()
 
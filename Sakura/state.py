@@ -1,4 +1,5 @@
 # Sakura/state.py
+import asyncio
 from typing import Dict, Set, Optional, List
 from pyrogram import Client
 from valkey.asyncio import Valkey as AsyncValkey
@@ -7,14 +8,39 @@ from google import genai
 # GLOBAL STATE & MEMORY SYSTEM
 user_ids: Set[int] = set()
 group_ids: Set[int] = set()
+supporter_ids: Set[int] = set()
 broadcast_mode: Dict[int, str] = {}
 user_message_counts: Dict[str, List] = {}
 rate_limited_users: Dict[str, float] = {}
+message_bursts: Dict[str, dict] = {}
+active_generations: Dict[str, dict] = {}
+media_groups: Dict[str, dict] = {}
+recent_media: Dict[int, dict] = {}
+fast_path_users: Dict[int, list] = {}
+fast_path_stats: Dict[str, int] = {"saved": 0, "capped": 0}
 user_last_response_time: Dict[int, float] = {}
 conversation_history: Dict[int, list] = {}
+conversation_summaries: Dict[int, str] = {}
+history_migrated: bool = False
+users_migrated: bool = False
 db_pool = None
 cleanup_task = None
 valkey_client: Optional[AsyncValkey] = None
+valkey_raw: Optional[AsyncValkey] = None
+near_cache: Dict[str, tuple] = {}
+near_cache_mode: Optional[str] = None
+near_cache_stats: Dict[str, Dict[str, int]] = {}
+near_cache_task = None
 payment_storage: Dict[str, dict] = {}
 effects_client: Optional[Client] = None
 gemini_client: Optional[genai.Client] = None
+gemini_clients: List[genai.Client] = []
+key_index: int = 0
+key_stats: List[dict] = []
+llm_backend = None
+gemini_semaphore: Optional[asyncio.Semaphore] = None
+prompt_caches: Dict[str, dict] = {}
+prompt_token_stats: Dict[str, int] = {"prompts": 0, "estimated": 0, "actual": 0, "max": 0}
+prompt_cache_retry: Dict[str, float] = {}
+response_pools: Dict[str, list] = {}
+ai_cache_stats: Dict[str, Dict[str, int]] = {"images": {"hits": 0, "misses": 0}, "polls": {"hits": 0, "misses": 0}, "voice": {"hits": 0, "misses": 0}}
@@ -0,0 +1,89 @@
+# tests/test_chat_limits.py
+import asyncio
+import pytest
+from Sakura.Chat import chat
+from Sakura import state
+
+
+class FakeSession:
+    """Async chat session that records how many calls overlap."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+
+    async def send_message(self, content):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            return content
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture(autouse=True)
+def no_key_pool(monkeypatch):
+    monkeypatch.setattr(state, "gemini_clients", [])
+    monkeypatch.setattr(state, "gemini_semaphore", None)
+
+
+def test_concurrent_calls_are_capped_by_semaphore():
+    session = FakeSession(delay=0.02)
+
+    async def run():
+        state.gemini_semaphore = asyncio.Semaphore(3)
+        return await asyncio.gather(*(chat.send_message(session, i) for i in range(10)))
+
+    assert asyncio.run(run()) == list(range(10))
+    assert session.peak == 3
+
+
+def test_slow_call_times_out(monkeypatch):
+    monkeypatch.setattr(chat, "AI_TIMEOUT", 0.05)
+    session = FakeSession(delay=1)
+
+    async def run():
+        state.gemini_semaphore = asyncio.Semaphore(1)
+        await chat.send_message(session, "hi")
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run())
+    assert session.active == 0
+
+
+def test_loop_stays_responsive_during_slow_call():
+    session = FakeSession(delay=0.2)
+
+    async def run():
+        ticks = 0
+
+        async def timer():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(timer())
+        await chat.send_message(session, "hi")
+        ticker.cancel()
+        return ticks
+
+    assert asyncio.run(run()) >= 10
+
+
+def test_rate_limit_is_charged_to_the_key_that_sent_it(monkeypatch):
+    monkeypatch.setattr(state, "gemini_clients", [object(), object()])
+    monkeypatch.setattr(state, "key_stats", [{"errors": 0, "cooldown_until": 0.0} for _ in range(2)])
+    # The pool rotated to key 1 while a call bound to key 0 was in flight
+    monkeypatch.setattr(state, "key_index", 1)
+
+    async def limited():
+        raise RuntimeError("429 RESOURCE_EXHAUSTED")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(chat.run_limited(limited(), key=0))
+    assert state.key_stats[0]["errors"] == 1
+    assert state.key_stats[1]["errors"] == 0
+    assert state.key_index == 1
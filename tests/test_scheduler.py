@@ -0,0 +1,44 @@
+# tests/test_scheduler.py
+import asyncio
+from Sakura.Services.scheduler import LLMScheduler
+
+
+def test_full_lane_sheds_the_heaviest_user_instead_of_a_newcomer():
+    async def run():
+        scheduler = LLMScheduler(1, {"groups": 3}, user_depth=3)
+        gate = asyncio.Event()
+
+        async def work(value):
+            await gate.wait()
+            return value
+
+        busy = asyncio.create_task(scheduler.submit("groups", 1, work("busy")))
+        await asyncio.sleep(0)
+        flood = [asyncio.create_task(scheduler.submit("groups", 1, work(i))) for i in range(3)]
+        await asyncio.sleep(0)
+        other = asyncio.create_task(scheduler.submit("groups", 2, work("other")))
+        await asyncio.sleep(0)
+        gate.set()
+        return await busy, await asyncio.gather(*flood), await other
+
+    busy, flood, other = asyncio.run(run())
+    assert busy == "busy"
+    assert flood == [None, 1, 2]
+    assert other == "other"
+
+
+def test_user_cap_rejects_before_the_lane_fills():
+    async def run():
+        scheduler = LLMScheduler(1, {"groups": 100}, user_depth=2)
+        gate = asyncio.Event()
+
+        async def work(value):
+            await gate.wait()
+            return value
+
+        tasks = [asyncio.create_task(scheduler.submit("groups", 1, work(i))) for i in range(4)]
+        await asyncio.sleep(0)
+        gate.set()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(run()) == [0, 1, 2, None]